@@ -0,0 +1,43 @@
+"""Per-call cost of `Model.collection`: cached handles vs rebuilding them."""
+import timeit
+from typing import Any
+
+from bson.codec_options import CodecOptions, TypeRegistry
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from overlead.odm.client import get_client
+from overlead.odm.motor.model import ObjectIdModel
+from overlead.odm.utils import fallback_pickle_encoder
+
+
+class Model(ObjectIdModel):
+    class Meta:
+        client = get_client(connect=False)
+        database_name = "bench"
+        collection_name = "model"
+
+
+def rebuild() -> AsyncIOMotorCollection:
+    registry = TypeRegistry(
+        type_codecs=Model.__meta__.type_codecs,
+        fallback_encoder=fallback_pickle_encoder,
+    )
+    database = Model.client.get_database(Model.database_name)
+    return database.get_collection(
+        Model.collection_name,
+        codec_options=CodecOptions[Any](type_registry=registry),
+    )
+
+
+def cached() -> AsyncIOMotorCollection:
+    return Model.collection
+
+
+def main(number: int = 20_000) -> None:
+    for name, func in (("rebuild", rebuild), ("cached", cached)):
+        seconds = timeit.timeit(func, number=number)
+        print(f"{name:>8}: {seconds / number * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Decode time and retained memory of dict vs `RawBSONDocument` reads."""
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from bson import decode_all, encode
+from bson.raw_bson import RawBSONDocument
+
+from overlead.odm.fields import ObjectId
+from overlead.odm.motor.model import ObjectIdModel
+
+
+class Post(ObjectIdModel):
+    title: str
+    views: int = 0
+    created: datetime
+    tags: list[str] = []
+    extra: dict[str, Any] = {}
+
+
+def document(i: int) -> dict[str, Any]:
+    return {
+        "_id": ObjectId(),
+        "title": f"title {i}",
+        "views": i,
+        "created": datetime.now(UTC),
+        "tags": ["a", "b", "c"],
+        "extra": {f"key_{k}": "value " * 5 for k in range(20)},
+    }
+
+
+def run(name: str, load: Callable[[], list[Post]]) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    models = load()
+    seconds = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:>5}: {len(models) / seconds:10.0f} docs/s,"
+        f" {retained / len(models):8.0f} bytes/doc retained",
+    )
+
+
+def main(count: int = 20_000) -> None:
+    payload = [encode(document(i)) for i in range(count)]
+    raw_options = Post._raw_codec_options
+    codec_options = Post._codec_options
+
+    # pymongo decodes a whole batch into dicts, then each model keeps its dict
+    run(
+        "dict",
+        lambda: [
+            Post._load(data, trusted=True)
+            for data in decode_all(b"".join(payload), codec_options)
+        ],
+    )
+    run(
+        "raw",
+        lambda: [
+            Post._load(RawBSONDocument(data, raw_options), trusted=True)
+            for data in payload
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Update diff of a wide document: full re-dump vs dirty-tracked fields."""
+import timeit
+from collections import defaultdict
+from typing import Any
+
+from bson import ObjectId
+from pydantic import create_model
+
+from overlead.odm.motor.model import ObjectIdModel
+from overlead.odm.types import undefined
+
+FIELDS = 200
+
+Wide = create_model(  # type: ignore[call-overload]
+    "Wide",
+    __base__=ObjectIdModel,
+    **{f"field_{i}": (str, "") for i in range(FIELDS)},
+)
+
+
+def full_diff(model: ObjectIdModel) -> dict[str, dict[str, Any]]:
+    """Diff used by `save()` before dirty tracking."""
+    olds = model._olds  # noqa: SLF001
+    data = model._dump()  # noqa: SLF001
+    upds: dict[str, dict[str, Any]] = defaultdict(dict)
+
+    for key in set(data) | set(olds):
+        new = data.get(key, undefined)
+        old = olds.get(key, undefined)
+
+        if new == old:
+            continue
+
+        if new is undefined:
+            upds["$unset"][key] = ""
+        else:
+            upds["$set"][key] = new
+
+    return upds
+
+
+def main(number: int = 2_000) -> None:
+    data = {"_id": ObjectId(), **{f"field_{i}": f"value {i}" for i in range(FIELDS)}}
+    model = Wide._load(data)  # noqa: SLF001
+    model.field_0 = "changed"
+
+    assert full_diff(model) == model._get_updates()[0]  # noqa: SLF001
+
+    for name, func in (
+        ("full", lambda: full_diff(model)),
+        ("dirty", lambda: model._get_updates()),  # noqa: SLF001
+    ):
+        seconds = timeit.timeit(func, number=number)
+        print(f"{name:>6}: {seconds / number * 1e6:8.2f} us/save")
+
+
+if __name__ == "__main__":
+    main()
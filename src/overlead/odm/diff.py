@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import Any, TypeAlias
+
+from overlead.odm.types import undefined
+
+__all__ = ["diff_values"]
+
+Operation: TypeAlias = tuple[str, str, Any]
+Updates: TypeAlias = dict[str, dict[str, Any]]
+
+
+def diff_values(path: str, old: Any, new: Any) -> Updates:
+    """
+    Операторы обновления MongoDB, превращающие `old` в `new` по пути `path`.
+
+    Изменения внутри вложенных документов и массивов записываются через
+    `$set`/`$unset` по пути с точками, дописывание в конец массива через `$push`.
+    Если операций получается не меньше, чем элементов в значении, то значение
+    заменяется целиком.
+    """
+    upds: Updates = defaultdict(dict)
+
+    if new is undefined:
+        if old is not undefined:
+            upds["$unset"][path] = ""
+        return upds
+
+    for operator, key, value in _diff(path, old, new):
+        upds[operator][key] = value
+
+    return upds
+
+
+def _diff(path: str, old: Any, new: Any) -> list[Operation]:
+    if old == new:
+        return []
+
+    operations = _diff_nested(path, old, new)
+    if operations is None or len(operations) >= _size(new):
+        return [("$set", path, new)]
+
+    return operations
+
+
+def _diff_nested(path: str, old: Any, new: Any) -> list[Operation] | None:
+    if isinstance(old, Mapping) and isinstance(new, Mapping):
+        return _diff_mapping(path, old, new)
+
+    if _is_array(old) and _is_array(new):
+        return _diff_array(path, old, new)
+
+    return None
+
+
+def _diff_mapping(
+    path: str,
+    old: Mapping[str, Any],
+    new: Mapping[str, Any],
+) -> list[Operation] | None:
+    if not all(_is_safe_key(key) for key in new.keys() | old.keys()):
+        return None
+
+    operations: list[Operation] = []
+    for key, value in new.items():
+        if key in old:
+            operations.extend(_diff(f"{path}.{key}", old[key], value))
+        else:
+            operations.append(("$set", f"{path}.{key}", value))
+
+    operations.extend(
+        ("$unset", f"{path}.{key}", "") for key in old.keys() - new.keys()
+    )
+    return operations
+
+
+def _diff_array(path: str, old: Any, new: Any) -> list[Operation] | None:
+    if len(new) > len(old) and _is_prefix(old, new):
+        return [("$push", path, {"$each": list(new[len(old) :])})]
+
+    if len(new) != len(old):
+        return None
+
+    operations: list[Operation] = []
+    for index, (old_value, new_value) in enumerate(zip(old, new, strict=True)):
+        operations.extend(_diff(f"{path}.{index}", old_value, new_value))
+    return operations
+
+
+def _is_prefix(old: Any, new: Any) -> bool:
+    return all(not _diff("", o, n) for o, n in zip(old, new, strict=False))
+
+
+def _is_array(value: Any) -> bool:
+    return isinstance(value, list | tuple)
+
+
+def _is_safe_key(key: Any) -> bool:
+    return isinstance(key, str) and bool(key) and "." not in key and key[0] != "$"
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, Mapping) or _is_array(value):
+        return len(value)
+    return 1
@@ -20,3 +20,31 @@ class ModelDatabaseNameError(OverleadOdmError):
 
 class ModelCollectionNameError(OverleadOdmError):
     """ModelCollectionNameError."""
+
+
+class ModelFieldError(OverleadOdmError):
+    """ModelFieldError."""
+
+
+class ModelUpsertKeyError(OverleadOdmError):
+    """ModelUpsertKeyError."""
+
+
+class TriggerBackgroundError(OverleadOdmError):
+    """TriggerBackgroundError."""
+
+
+class ModelPageTokenError(OverleadOdmError):
+    """ModelPageTokenError."""
+
+
+class ModelSortIndexError(OverleadOdmError):
+    """ModelSortIndexError."""
+
+
+class ModelPartitionError(OverleadOdmError):
+    """ModelPartitionError."""
+
+
+class IndexRebuildError(OverleadOdmError):
+    """IndexRebuildError."""
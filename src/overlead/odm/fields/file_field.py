@@ -123,6 +123,10 @@ class FileField(ObjectId):
         async with self as stream:
             return stream.upload_date
 
+    @classmethod
+    def __load_trusted__(cls, v: ObjectIdType, field: ModelField) -> Self:
+        return cls(v, field)
+
     @classmethod
     def __validate__(cls, v: ObjectIdType, field: ModelField) -> Self:
         v = super().__validate__(v, field)
@@ -61,6 +61,10 @@ class ObjectId(BSONObjectId):
 
         return cast(Self, v)
 
+    @classmethod
+    def __load_trusted__(cls, v: Any, field: ModelField) -> Self:  # pyright: ignore
+        return v if isinstance(v, cls) else cls(v)
+
     @classmethod
     def __modify_schema__(cls, field_schema: dict[str, Any]) -> None:
         field_schema.update(
@@ -11,8 +11,6 @@ from overlead.odm.fields.objectid_field import (
 from overlead.odm.model import BaseModel
 
 if TYPE_CHECKING:  # pragma: no cover
-    from collections.abc import Awaitable
-
     from pydantic.fields import ModelField
 
     from overlead.odm.motor.model import MotorModel
@@ -55,6 +53,7 @@ class Reference(ObjectId, Generic[M]):
 
     type_: type[M]
     field: ModelField
+    document: M | None
 
     def __init__(self, v: ObjectIdType, type_: type[M], field: ModelField) -> None:
         super().__init__(v)
@@ -64,6 +63,7 @@ class Reference(ObjectId, Generic[M]):
 
         self.type_ = type_
         self.field = field
+        self.document = None
 
     @classmethod
     def __validate__(cls, v: Any, field: ModelField) -> Self:
@@ -91,9 +91,16 @@ class Reference(ObjectId, Generic[M]):
 
         return cls(super().__validate__(v, field), type_, field)  # pyright: ignore
 
-    def load(self) -> Awaitable[M | None]:
-        """Загрузить документ."""
-        return self.type_.find_one({"_id": self})
+    @classmethod
+    def __load_trusted__(cls, v: Any, field: ModelField) -> Self:
+        assert field.sub_fields
+        return cls(v, field.sub_fields[0].type_, field)
+
+    async def load(self) -> M | None:
+        """Загрузить документ, если он еще не загружен `resolve_references`."""
+        if self.document is not None:
+            return self.document
+        return await self.type_.find_one({"_id": self})
 
     def __getstate__(self) -> dict[str, Any]:  # type: ignore[override]
         state = self.__dict__.copy()
@@ -104,4 +111,5 @@ class Reference(ObjectId, Generic[M]):
 
     def __setstate__(self, state: dict[str, Any]) -> None:
         self._ObjectId__id = state.pop("_ObjectId__id")
+        self.document = None
         self.__dict__.update(state)
@@ -10,6 +10,9 @@ __all__ = ["Index"]
 
 IndexKeysValues = Union[Literal[1], Literal[-1], Literal["text"], Literal["hashed"]]
 
+# Настройки, которые сервер не возвращает в `listIndexes` или игнорирует
+UNCOMPARED_OPTS = frozenset({"name", "background"})
+
 
 class IndexTypeError(TypeError):
     """Неверный тип индекса."""
@@ -150,3 +153,45 @@ class Index(BaseModel):
             return Index(keys=keys, opts=opts)
 
         return Index(keys="", opts={})  # type: ignore[arg-type]
+
+    @property
+    def name(self) -> str:
+        """Имя индекса, по умолчанию как его генерирует монга."""
+        if self.opts.name:
+            return self.opts.name
+        return "_".join(f"{key}_{value}" for key, value in self.keys.__root__.items())
+
+    @property
+    def key(self) -> dict[str, Any]:
+        """Ключ индекса в виде, в котором его возвращает `listIndexes`."""
+        key: dict[str, Any] = {}
+        for name, value in self.keys.__root__.items():
+            if value != "text":
+                key[name] = value
+            elif "_fts" not in key:
+                key.update(_fts="text", _ftsx=1)
+        return key
+
+    def options(self) -> dict[str, Any]:
+        """Настройки индекса для `create_index` с именами как в монге."""
+        return self.opts.dict(by_alias=True)
+
+    def diff(self, info: Mapping[str, Any]) -> frozenset[str]:
+        """Отличия от описания индекса из `listIndexes`: `key` и имена настроек."""
+        diff = set()
+        if list(info["key"].items()) != list(self.key.items()):
+            diff.add("key")
+
+        options = self.options()
+        for field in IndexOpts.__fields__.values():
+            if field.name in UNCOMPARED_OPTS:
+                continue
+            if _option(options.get(field.alias)) != _option(info.get(field.alias)):
+                diff.add(field.alias)
+
+        return frozenset(diff)
+
+
+def _option(value: Any) -> Any:
+    # Выключенные флаги монга не сохраняет
+    return None if value is False else value
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Collection, Mapping
+from copy import deepcopy
+from datetime import datetime
+from types import NoneType
+from typing import Any, TypeAlias, TypeVar
+from weakref import WeakKeyDictionary
+
+from pydantic import BaseModel, ValidationError
+from pydantic.error_wrappers import ErrorList, ErrorWrapper
+from pydantic.errors import MissingError
+from pydantic.fields import SHAPE_DICT, SHAPE_LIST, SHAPE_SINGLETON, ModelField
+from pydantic.utils import lenient_issubclass
+
+from overlead.odm.types import UndefinedType, undefined
+
+__all__ = ["load_fields", "load_trusted"]
+
+_M = TypeVar("_M", bound=BaseModel)
+Loader: TypeAlias = Callable[[Any], Any]
+FieldLoader: TypeAlias = tuple[str, str, ModelField, Loader | None]
+
+_PASSTHROUGH_TYPES = (Any, object, str, int, bool, bytes, datetime, UndefinedType)
+# значения этих типов могут быть списками и словарями из документа
+_MUTABLE_PASSTHROUGH_TYPES = (Any, object)
+# декодированный BSON содержит ровно list и dict
+_CONTAINER_TYPES = frozenset({list, dict})
+_object_setattr = object.__setattr__
+_loaders: WeakKeyDictionary[type[BaseModel], tuple[tuple[FieldLoader, ...], bool]] = (
+    WeakKeyDictionary()
+)
+
+
+def load_trusted(cls: type[_M], data: Mapping[str, Any]) -> _M:
+    """
+    Создать модель из доверенного документа без полной валидации.
+
+    Значения простых типов берутся как есть, вложенные модели, `ObjectId` и
+    ссылки собираются напрямую, остальные поля валидируются по отдельности.
+    Модели с валидаторами и документы без обязательных полей валидируются
+    целиком.
+    """
+    loaders, validated = _get_loaders(cls)
+    if validated:
+        return cls(**data)
+
+    values: dict[str, Any] = {}
+    fields_set: set[str] = set()
+
+    for name, alias, field, loader in loaders:
+        if alias in data:
+            value = data[alias]
+            fields_set.add(name)
+        elif name in data:
+            value = data[name]
+            fields_set.add(name)
+        elif field.required:
+            return cls(**data)
+        else:
+            values[name] = field.get_default()
+            continue
+
+        if loader is not None and value is not None:
+            value = loader(value)
+        values[name] = value
+
+    return _build(cls, values, fields_set)
+
+
+def load_fields(
+    cls: type[_M],
+    data: Mapping[str, Any],
+    names: Collection[str],
+    *,
+    trusted: bool = False,
+) -> _M:
+    """
+    Создать частичную модель только из полей `names`, остальные поля `undefined`.
+
+    Загруженные поля валидируются по отдельности (доверенные собираются как в
+    `load_trusted`), валидаторы модели не вызываются.
+    """
+    values: dict[str, Any] = {}
+    fields_set: set[str] = set()
+    errors: list[ErrorList] = []
+
+    for name, alias, field, loader in _get_loaders(cls)[0]:
+        if name not in names:
+            values[name] = undefined
+            continue
+
+        if alias in data:
+            value = data[alias]
+            fields_set.add(name)
+        elif name in data:
+            value = data[name]
+            fields_set.add(name)
+        elif field.required:
+            errors.append(ErrorWrapper(MissingError(), loc=alias))
+            continue
+        else:
+            values[name] = field.get_default()
+            continue
+
+        if not trusted:
+            value, error = field.validate(value, values, loc=alias, cls=cls)
+            if error:
+                errors.append(error)
+                continue
+        elif loader is not None and value is not None:
+            value = loader(value)
+        values[name] = value
+
+    if errors:
+        raise ValidationError(errors, cls)
+
+    return _build(cls, values, fields_set)
+
+
+def _build(cls: type[_M], values: dict[str, Any], fields_set: set[str]) -> _M:
+    doc = cls.__new__(cls)
+    _object_setattr(doc, "__dict__", values)
+    _object_setattr(doc, "__fields_set__", fields_set)
+    doc._init_private_attributes()  # noqa: SLF001
+    return doc
+
+
+def _get_loaders(cls: type[BaseModel]) -> tuple[tuple[FieldLoader, ...], bool]:
+    """Загрузчики полей и признак того, что у модели есть валидаторы."""
+    try:
+        return _loaders[cls]
+    except KeyError:
+        pass
+
+    validated = bool(cls.__pre_root_validators__ or cls.__post_root_validators__)
+    loaders: list[FieldLoader] = []
+    for name, field in cls.__fields__.items():
+        if field.class_validators:
+            validated = True
+            loader: Loader | None = _validator(cls, field)
+        else:
+            loader = _field_loader(cls, field)
+        loaders.append((name, field.alias, field, loader))
+
+    _loaders[cls] = (tuple(loaders), validated)
+    return _loaders[cls]
+
+
+def _field_loader(cls: type[BaseModel], field: ModelField) -> Loader | None:
+    hook = getattr(field.type_, "__load_trusted__", None)
+    if hook is not None:
+        return lambda v: hook(v, field)
+
+    if field.shape == SHAPE_SINGLETON:
+        return _singleton_loader(cls, field)
+
+    if field.shape in (SHAPE_LIST, SHAPE_DICT) and field.sub_fields:
+        return _container_loader(cls, field, field.sub_fields[0])
+
+    return _validator(cls, field)
+
+
+def _container_loader(
+    cls: type[BaseModel],
+    field: ModelField,
+    sub_field: ModelField,
+) -> Loader:
+    # копия, иначе изменения на месте попадут и в `_olds` документа
+    if sub_field.type_ in _MUTABLE_PASSTHROUGH_TYPES:
+        return _copy_list if field.shape == SHAPE_LIST else _copy_dict
+
+    loader = _field_loader(cls, sub_field)
+    if loader is None:
+        return list if field.shape == SHAPE_LIST else dict
+    if field.shape == SHAPE_LIST:
+        return lambda v: [i if i is None else loader(i) for i in v]
+    return lambda v: {k: i if i is None else loader(i) for k, i in v.items()}
+
+
+def _singleton_loader(cls: type[BaseModel], field: ModelField) -> Loader | None:
+    if field.sub_fields:
+        # Union: undefined и None из базы не приходят, остаётся один тип
+        sub_fields = [
+            sub
+            for sub in field.sub_fields
+            if sub.type_ is not UndefinedType and sub.type_ is not NoneType
+        ]
+        if len(sub_fields) == 1:
+            return _field_loader(cls, sub_fields[0])
+        if all(_field_loader(cls, sub) is None for sub in sub_fields):
+            return None
+        return _validator(cls, field)
+
+    if field.type_ in _PASSTHROUGH_TYPES:
+        return _copy_container if field.type_ in _MUTABLE_PASSTHROUGH_TYPES else None
+
+    if lenient_issubclass(field.type_, BaseModel):
+        model: type[BaseModel] = field.type_
+        return lambda v: v if isinstance(v, model) else load_trusted(model, v)
+
+    return _validator(cls, field)
+
+
+def _copy_container(v: Any) -> Any:
+    return deepcopy(v) if isinstance(v, list | dict) else v
+
+
+def _copy_list(v: list[Any]) -> list[Any]:
+    copy = list(v)
+    if not _CONTAINER_TYPES.isdisjoint(map(type, copy)):
+        for i, item in enumerate(copy):
+            if isinstance(item, list | dict):
+                copy[i] = deepcopy(item)
+    return copy
+
+
+def _copy_dict(v: dict[str, Any]) -> dict[str, Any]:
+    copy = dict(v)
+    if not _CONTAINER_TYPES.isdisjoint(map(type, copy.values())):
+        for key, item in copy.items():
+            if isinstance(item, list | dict):
+                copy[key] = deepcopy(item)
+    return copy
+
+
+def _validator(cls: type[BaseModel], field: ModelField) -> Loader:
+    def validate(v: Any) -> Any:
+        value, error = field.validate(v, {}, loc=field.alias, cls=cls)
+        if error:
+            raise ValidationError([error], cls)
+        return value
+
+    return validate
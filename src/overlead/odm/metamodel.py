@@ -9,13 +9,15 @@ from pydantic.main import ModelMetaclass
 
 from overlead.odm.errors import ModelInvalidIndexError
 from overlead.odm.index import Index
-from overlead.odm.triggers import trigger
+from overlead.odm.triggers import build_trigger_table, trigger
 from overlead.odm.types import classproperty
 
 if TYPE_CHECKING:  # pragma: no cover
     from bson.codec_options import TypeCodec
 
     from overlead.odm.model import BaseModel
+    from overlead.odm.motor.background import BackgroundRunner
+    from overlead.odm.motor.cache import QueryCache
 
 _T = TypeVar("_T")
 
@@ -64,9 +66,18 @@ class BaseMeta:
     database_name: str | None = None
     collection_name: str | None = None
 
+    trusted_load: bool = False
+    raw_load: bool = False
+
+    coalesce_writes: bool = False
+    coalesce_max_batch: int = 1000
+    coalesce_delay: float = 0.005
+
     indexes: tuple[Index, ...] = ()
     type_codecs: tuple[TypeCodec, ...] = ()
     triggers: tuple[trigger[Any, Any, Any], ...] = ()
+    trigger_runner: BackgroundRunner | None = None
+    query_cache: QueryCache | None = None
 
     @classproperty
     @classmethod
@@ -87,6 +98,8 @@ class BaseModelMetaclass(ModelMetaclass):
     __BASE_MODEL_CLASSES__: ClassVar[list[type[BaseModel[Any]]]] = []
     __meta__: type[BaseMeta]
     __registry__: list[type[PydanticModel]]
+    __handles__: dict[str, tuple[tuple[Any, ...], Any]]
+    __aliases__: frozenset[str]
 
     def __new__(  # noqa: D102
         cls,
@@ -129,6 +142,8 @@ class BaseModelMetaclass(ModelMetaclass):
         namespace["Config"] = config
         # Namespace для нового классаол
         namespace["__meta__"] = meta
+        # Кеш хендлов (registry, codec options, коллекция) для каждого класса
+        namespace["__handles__"] = {}
         # namespace["__classes__"] = []
         # namespace["__triggers__"] = defaultdict(lambda: defaultdict(list))
 
@@ -137,6 +152,12 @@ class BaseModelMetaclass(ModelMetaclass):
 
         new: type[BaseModel[_T]] = super().__new__(cls, name, bases, namespace, **kwds)
         new.update_forward_refs()
+        new.__aliases__ = frozenset(field.alias for field in new.__fields__.values())
+        # Таблица тригеров по типам, пересобирается при замене `meta.triggers`
+        new.__handles__["triggers"] = (
+            (meta.triggers,),
+            build_trigger_table(meta.triggers),
+        )
         new.__registry__.append(new)
 
         if not base_cls:
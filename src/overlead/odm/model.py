@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from collections.abc import Mapping  # noqa: TCH003
+import operator
+from collections import defaultdict
+from collections.abc import Collection, Mapping  # noqa: TCH003
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -9,10 +11,13 @@ from typing import (
     ParamSpec,
     Self,
     TypeVar,
+    cast,
 )
 
 import orjson
+from bson import decode
 from bson.codec_options import CodecOptions, TypeRegistry
+from bson.raw_bson import RawBSONDocument
 from motor.motor_asyncio import (
     AsyncIOMotorClient,
     AsyncIOMotorCollection,
@@ -21,22 +26,27 @@ from motor.motor_asyncio import (
 from pydantic.fields import PrivateAttr
 from pydantic.generics import GenericModel as PydanticModel
 
+from overlead.odm.diff import diff_values
 from overlead.odm.errors import (
     ModelClientError,
     ModelCollectionNameError,
     ModelDatabaseNameError,
+    ModelFieldError,
 )
+from overlead.odm.loader import load_fields, load_trusted
 from overlead.odm.metamodel import BaseModelMetaclass
+from overlead.odm.triggers import build_trigger_table
 from overlead.odm.types import Undefined, classproperty, undefined
 from overlead.odm.utils import (
     PickledBinaryDecoder,
     exclude_undefined_values,
     fallback_pickle_encoder,
     json_dumps,
+    mutable_keys,
 )
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Generator
+    from collections.abc import Callable
 
     from pydantic.typing import AbstractSetIntStr, MappingIntStrAny
 
@@ -53,11 +63,30 @@ class BaseModel(PydanticModel, Generic[_ModelIdType], metaclass=BaseModelMetacla
     """Base model for collections."""
 
     _olds: Mapping[str, Any] = PrivateAttr({})
+    _dirty: set[str] = PrivateAttr(default_factory=set)
+    _loaded: frozenset[str] | None = PrivateAttr(None)
     id: Undefined[_ModelIdType] = undefined
 
     def __init_subclass__(cls) -> None:
         super().__init_subclass__()
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name not in self.__fields__:
+            super().__setattr__(name, value)
+            return
+
+        values = self.__dict__
+        super().__setattr__(name, value)
+        self._dirty.add(name)
+
+        # root validators may change other fields on assignment
+        if self.__pre_root_validators__ or self.__post_root_validators__:
+            self._dirty.update(
+                key
+                for key, val in self.__dict__.items()
+                if values.get(key, undefined) is not val
+            )
+
     class Meta:
         """Base settings for collections."""
 
@@ -147,10 +176,13 @@ class BaseModel(PydanticModel, Generic[_ModelIdType], metaclass=BaseModelMetacla
             **dumps_kwargs,
         )
 
-    def _dump(self) -> Dict[str, Any]:  # noqa: UP006
+    def _dump(
+        self,
+        include: AbstractSetIntStr | None = None,
+    ) -> Dict[str, Any]:  # noqa: UP006
         return self.dict(
             exclude=None,
-            include=None,
+            include=include,
             exclude_undefined=True,
             exclude_defaults=False,
             exclude_none=False,
@@ -159,11 +191,125 @@ class BaseModel(PydanticModel, Generic[_ModelIdType], metaclass=BaseModelMetacla
         )
 
     @classmethod
-    def _load(cls, data: Mapping[str, Any]) -> Self:
-        doc = cls(**data)
+    def _load(
+        cls,
+        data: Mapping[str, Any],
+        trusted: bool | None = None,
+        fields: frozenset[str] | None = None,
+    ) -> Self:
+        """
+        Create model from database document.
+
+        Trusted documents (`trusted` or `__meta__.trusted_load`) skip the full
+        pydantic validation, see `overlead.odm.loader.load_trusted`.
+        `RawBSONDocument` is decoded once for the model and only its bytes are
+        kept as `_olds`, they are decoded again on save.
+        With `fields` (see `_projection`) only these fields are loaded, the
+        others are `undefined` and are not saved unless assigned.
+        """
+        if trusted is None:
+            trusted = cls.__meta__.trusted_load
+
+        values = (
+            decode(data.raw, cls._codec_options)
+            if isinstance(data, RawBSONDocument)
+            else data
+        )
+
+        if fields is not None:
+            doc = load_fields(cls, values, fields, trusted=trusted)
+            doc._loaded = fields  # noqa: SLF001
+        elif trusted:
+            doc = load_trusted(cls, values)
+        else:
+            doc = cls(**values)
+
         doc._olds = data  # noqa: SLF001
         return doc
 
+    @classmethod
+    def _projection(
+        cls,
+        fields: Collection[str],
+    ) -> tuple[frozenset[str], Dict[str, bool]]:  # noqa: UP006
+        """Get names of loaded fields (`id` is always loaded) and projection."""
+        for name in fields:
+            if name not in cls.__fields__:
+                raise ModelFieldError(name)
+
+        names = frozenset({"id", *fields})
+        return names, {cls.__fields__[name].alias: True for name in names}
+
+    def _get_olds(self) -> Dict[str, Any]:  # noqa: UP006
+        """Get decoded copy of the stored document."""
+        if isinstance(self._olds, RawBSONDocument):
+            return decode(self._olds.raw, self._codec_options)
+        return dict(self._olds)
+
+    def _changed_fields(self, olds: Mapping[str, Any] | None = None) -> set[str]:
+        """
+        Get names of fields which may differ from `olds` (default `_olds`).
+
+        Assigned fields are tracked by `__setattr__`. Fields holding mutable
+        values can be changed in place, so they are always checked, as well as
+        fields missing from `olds`. Partial models check only loaded fields.
+        """
+        if olds is None:
+            olds = self._get_olds()
+
+        changed = set(self._dirty)
+        changed.update(mutable_keys(self.__dict__))
+
+        missing = type(self).__aliases__ - olds.keys()
+        if missing:
+            changed.update(
+                name
+                for name, field in self.__fields__.items()
+                if field.alias in missing
+            )
+
+        if self._loaded is not None:
+            changed &= self._loaded | self._dirty
+
+        return changed
+
+    def _get_updates(
+        self,
+    ) -> tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:  # noqa: UP006
+        """Get update operators for changed fields and the new `_olds` snapshot."""
+        olds = self._get_olds()
+        fields = self._changed_fields(olds)
+        data = self._dump(include=fields)
+        upds: Dict[str, Dict[str, Any]] = defaultdict(dict)  # noqa: UP006
+
+        keys = {self.__fields__[name].alias for name in fields}
+        # keys stored in the document which are not fields of the model
+        keys.update(olds.keys() - type(self).__aliases__)
+
+        for key in keys:
+            new = data.get(key, undefined)
+            old = olds.get(key, undefined)
+
+            if new == old:
+                continue
+
+            for op, values in diff_values(key, old, new).items():
+                upds[op].update(values)
+
+            if new is undefined:
+                del olds[key]
+            else:
+                olds[key] = new
+
+        return upds, olds
+
+    def _reset_changes(self, olds: Mapping[str, Any]) -> None:
+        """Mark current state as stored in the database."""
+        self._olds = olds
+        if self._loaded is not None:
+            self._loaded |= self._dirty
+        self._dirty.clear()
+
     @classproperty
     @classmethod
     def client(cls) -> AsyncIOMotorClient:
@@ -204,35 +350,101 @@ class BaseModel(PydanticModel, Generic[_ModelIdType], metaclass=BaseModelMetacla
     @classmethod
     def database(cls) -> AsyncIOMotorDatabase:
         """Motor database."""
-        return cls.client.get_database(cls.database_name)
+        meta = cls.__meta__
+        return cls._cached_handle(
+            "database",
+            (meta.client, meta.database_name),
+            lambda: cls.client.get_database(cls.database_name),
+        )
 
     @classproperty
     @classmethod
     def collection(cls) -> AsyncIOMotorCollection:
         """Motor collection."""
-        return cls.database.get_collection(
-            cls.collection_name,
-            codec_options=cls._codec_options,
+        meta = cls.__meta__
+        return cls._cached_handle(
+            "collection",
+            (meta.client, meta.database_name, meta.collection_name, meta.type_codecs),
+            lambda: cls.database.get_collection(
+                cls.collection_name,
+                codec_options=cls._codec_options,
+            ),
+        )
+
+    @classproperty
+    @classmethod
+    def _raw_collection(cls) -> AsyncIOMotorCollection:
+        """Motor collection returning `RawBSONDocument` documents."""
+        meta = cls.__meta__
+        return cls._cached_handle(
+            "raw_collection",
+            (meta.client, meta.database_name, meta.collection_name, meta.type_codecs),
+            lambda: cls.collection.with_options(
+                codec_options=cls._raw_codec_options,
+            ),
         )
 
     @classproperty
     @classmethod
     def _codec_options(cls) -> CodecOptions[Any]:
-        return CodecOptions(type_registry=cls._type_registry)
+        return cls._cached_handle(
+            "codec_options",
+            (cls.__meta__.type_codecs,),
+            lambda: CodecOptions(type_registry=cls._type_registry),
+        )
+
+    @classproperty
+    @classmethod
+    def _raw_codec_options(cls) -> CodecOptions[RawBSONDocument]:
+        return cls._cached_handle(
+            "raw_codec_options",
+            (cls.__meta__.type_codecs,),
+            lambda: cls._codec_options.with_options(document_class=RawBSONDocument),
+        )
 
     @classproperty
     @classmethod
     def _type_registry(cls) -> TypeRegistry:
-        return TypeRegistry(
-            type_codecs=cls.__meta__.type_codecs,
-            fallback_encoder=fallback_pickle_encoder,
+        return cls._cached_handle(
+            "type_registry",
+            (cls.__meta__.type_codecs,),
+            lambda: TypeRegistry(
+                type_codecs=cls.__meta__.type_codecs,
+                fallback_encoder=fallback_pickle_encoder,
+            ),
         )
 
+    @classmethod
+    def _cached_handle(
+        cls,
+        name: str,
+        key: tuple[Any, ...],
+        factory: Callable[[], R],
+    ) -> R:
+        """
+        Get per-class cached handle.
+
+        The handle is rebuilt by `factory` when any item of `key` (the `__meta__`
+        values it depends on) is replaced, e.g. after `__meta__.client` is set.
+        Items are compared by identity: equal clients are still different pools.
+        """
+        cached = cls.__handles__.get(name)
+        if cached is not None and all(map(operator.is_, cached[0], key)):
+            return cast(R, cached[1])
+
+        value = factory()
+        cls.__handles__[name] = (key, value)
+        return value
+
     @classmethod
     def _get_triggers(
         cls,
         type_: type[trigger[T, P, R]],
-    ) -> Generator[trigger[T, P, R], None, None]:
-        for tr in cls.__meta__.triggers:
-            if isinstance(tr, type_):
-                yield tr
+    ) -> tuple[trigger[T, P, R], ...]:
+        """Get triggers of `type_` from the per-class dispatch table."""
+        table = cls._cached_handle(
+            "triggers",
+            (cls.__meta__.triggers,),
+            lambda: build_trigger_table(cls.__meta__.triggers),
+        )
+        return table.get(type_, ())
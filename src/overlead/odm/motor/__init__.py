@@ -1,3 +1,19 @@
+from .advisor import QueryAdvisor
+from .background import BackgroundRunner
+from .cache import LRUCache, QueryCache
+from .changes import ChangeWatcher, Materialized
+from .identity_map import IdentityMap
+from .lookup import Lookup
 from .model import ObjectIdModel
 
-__all__ = ["ObjectIdModel"]
+__all__ = [
+    "BackgroundRunner",
+    "ChangeWatcher",
+    "IdentityMap",
+    "LRUCache",
+    "Lookup",
+    "Materialized",
+    "ObjectIdModel",
+    "QueryAdvisor",
+    "QueryCache",
+]
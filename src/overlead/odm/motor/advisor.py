@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from collections.abc import Mapping
+from contextvars import ContextVar, Token
+from typing import TYPE_CHECKING, Any, NamedTuple, Self, TypeAlias
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable
+    from types import TracebackType
+
+    from overlead.odm.motor.model import MotorModel
+
+__all__ = [
+    "QueryAdvisor",
+    "QueryShape",
+    "QueryStats",
+    "filter_shape",
+    "index_keys",
+    "is_covered",
+    "sort_shape",
+]
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[QueryAdvisor | None] = ContextVar("query_advisor", default=None)
+
+EQUALITY_OPERATORS = frozenset({"$eq", "$in"})
+RANGE_OPERATORS = frozenset(
+    {"$gt", "$gte", "$lt", "$lte", "$regex", "$exists", "$elemMatch", "$all"},
+)
+
+# Поле фильтра -> "eq", "range", "other" или ветки `$or`
+Filter: TypeAlias = tuple[tuple[str, Any], ...]
+Sort: TypeAlias = tuple[tuple[str, Any], ...]
+IndexKey: TypeAlias = tuple[tuple[str, Any], ...]
+
+ID_KEY: IndexKey = (("_id", 1),)
+
+
+class QueryShape(NamedTuple):
+    """Query without values: kinds of filtered fields and sort."""
+
+    collection: str
+    filter: Filter
+    sort: Sort
+
+
+class QueryStats(NamedTuple):
+    """How often a query shape ran and if a declared index supports it."""
+
+    shape: QueryShape
+    runs: int
+    covered: bool
+    operations: tuple[str, ...]
+    stage: str | None
+
+
+class QueryAdvisor:
+    """
+    Check queries against declared `Meta.indexes`.
+
+    Inside `with QueryAdvisor():` filters and sorts of `find`, `find_one`,
+    `count_documents`, `update_*` and `delete_*` are reduced to shapes and
+    counted. A shape is covered if an index (or `_id`) starts with equality
+    fields, then the sort keys in order (or all reversed), then a range field.
+    Uncovered shapes are logged once. With `explain` a sample query of every
+    shape is kept and `await explain()` gets the winning plan stage.
+    """
+
+    def __init__(self, *, explain: bool = False) -> None:
+        self.keep_samples = explain
+        self._counts: Counter[QueryShape] = Counter()
+        self._covered: dict[QueryShape, bool] = {}
+        self._operations: dict[QueryShape, dict[str, None]] = {}
+        self._samples: dict[QueryShape, tuple[type[MotorModel[Any]], Any]] = {}
+        self._stages: dict[QueryShape, str] = {}
+        self._tokens: list[Token[QueryAdvisor | None]] = []
+
+    @staticmethod
+    def current() -> QueryAdvisor | None:
+        """Get query advisor of the current context."""
+        return _current.get()
+
+    def __enter__(self) -> Self:
+        self._tokens.append(_current.set(self))
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        _current.reset(self._tokens.pop())
+
+    def record(
+        self,
+        model: type[MotorModel[Any]],
+        operation: str,
+        filter: Any,  # noqa: A002
+        sort: Any = None,
+    ) -> QueryShape:
+        """Count query, check its shape on the first run."""
+        if not isinstance(filter, Mapping):
+            # pymongo принимает значение `_id` вместо фильтра
+            filter = {} if filter is None else {"_id": filter}  # noqa: A001
+        shape = QueryShape(
+            model.collection_name,
+            filter_shape(filter or {}),
+            sort_shape(sort),
+        )
+        self._counts[shape] += 1
+        self._operations.setdefault(shape, {}).setdefault(operation)
+
+        if shape not in self._covered:
+            covered = is_covered(index_keys(model), shape.filter, shape.sort)
+            self._covered[shape] = covered
+            if not covered:
+                logger.warning("%s: query is not covered by indexes %s", model, shape)
+            if self.keep_samples:
+                self._samples[shape] = (model, filter)
+
+        return shape
+
+    def report(self) -> list[QueryStats]:
+        """Stats of all query shapes, the most frequent first."""
+        return [
+            QueryStats(
+                shape,
+                count,
+                self._covered[shape],
+                tuple(self._operations[shape]),
+                self._stages.get(shape),
+            )
+            for shape, count in self._counts.most_common()
+        ]
+
+    def unindexed(self) -> list[QueryStats]:
+        """Stats of query shapes not covered by indexes."""
+        return [stats for stats in self.report() if not stats.covered]
+
+    async def explain(self) -> dict[QueryShape, str]:
+        """Run `explain()` for a sample of every shape, get winning plan stages."""
+        for shape, (model, filter_) in self._samples.items():
+            cursor = model.collection.find(filter_)
+            if shape.sort:
+                cursor = cursor.sort(list(shape.sort))
+            plan = await cursor.explain()
+            self._stages[shape] = _stage(plan["queryPlanner"]["winningPlan"])
+        return dict(self._stages)
+
+
+def filter_shape(filter: Mapping[str, Any]) -> Filter:  # noqa: A002
+    """Reduce filter to sorted field kinds, `$and` is flattened."""
+    fields: dict[str, Any] = {}
+    for key, value in filter.items():
+        if key == "$and":
+            for item in value:
+                fields.update(filter_shape(item))
+        elif key == "$or":
+            branches = {filter_shape(item) for item in value}
+            fields[key] = tuple(sorted(branches, key=repr))
+        elif key.startswith("$"):
+            fields[key] = "other"
+        elif isinstance(value, Mapping) and any(str(o).startswith("$") for o in value):
+            operators = set(value) - {"$options"}
+            if operators <= EQUALITY_OPERATORS:
+                fields[key] = "eq"
+            elif operators & RANGE_OPERATORS:
+                fields[key] = "range"
+            else:
+                fields[key] = "other"
+        else:
+            fields[key] = "eq"
+    return tuple(sorted(fields.items()))
+
+
+def sort_shape(sort: Any) -> Sort:
+    """Normalize `sort` argument to `(key, direction)` pairs."""
+    if not sort:
+        return ()
+    if isinstance(sort, str):
+        return ((sort, 1),)
+    if isinstance(sort, Mapping):
+        return tuple(sort.items())
+    return tuple((key, direction) for key, direction in sort)
+
+
+def is_covered(
+    keys: Iterable[IndexKey],
+    filter: Filter,  # noqa: A002
+    sort: Sort,
+) -> bool:
+    """Check if any index key supports filter and sort by the ESR rule."""
+    keys = list(keys)
+    fields = dict(filter)
+    branches = fields.pop("$or", None)
+    if branches is not None:
+        rest = tuple(fields.items())
+        return all(
+            is_covered(keys, (*rest, *branch), sort) for branch in branches
+        )
+
+    if "$text" in fields:
+        return any(value == "text" for key in keys for _, value in key)
+
+    if not fields and not sort:
+        return True
+
+    return any(_supports(key, fields, sort) for key in keys)
+
+
+def _supports(key: IndexKey, fields: dict[str, Any], sort: Sort) -> bool:
+    used = 0
+    sorted_ = 0
+    direction = None
+    equality = True
+
+    for name, value in key:
+        if equality and fields.get(name) == "eq":
+            used += 1
+            continue
+
+        equality = False
+        if sorted_ < len(sort) and sort[sorted_][0] == name and value in (1, -1):
+            order = sort[sorted_][1] * value
+            if direction not in (None, order):
+                break
+            direction = order
+            sorted_ += 1
+            continue
+
+        if sorted_ == len(sort) and fields.get(name) == "range" and value in (1, -1):
+            used += 1
+        break
+
+    return sorted_ == len(sort) and (used > 0 or not fields)
+
+
+def index_keys(model: type[MotorModel[Any]]) -> list[IndexKey]:
+    """Keys of `_id` and declared indexes of model."""
+    return [
+        ID_KEY,
+        *(tuple(index.keys.__root__.items()) for index in model.__meta__.indexes),
+    ]
+
+
+def _stage(plan: Mapping[str, Any]) -> str:
+    # Самая глубокая стадия плана: COLLSCAN, IXSCAN, ...
+    plan = plan.get("queryPlan", plan)
+    while "inputStage" in plan:
+        plan = plan["inputStage"]
+    return str(plan.get("stage"))
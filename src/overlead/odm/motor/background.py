@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable, Coroutine
+
+__all__ = ["DEFAULT_CONCURRENCY", "BackgroundRunner", "default_runner"]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 100
+
+
+class BackgroundRunner:
+    """
+    Bounded queue of `background` triggers.
+
+    At most `concurrency` callbacks run at once, the rest wait in the queue.
+    Failed callbacks are passed to `on_error` (logged by default) and counted
+    in `errors`. Call `drain()` on shutdown to wait for the queued callbacks.
+    """
+
+    concurrency: int
+    errors: int
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        on_error: Callable[[BaseException], Any] | None = None,
+    ) -> None:
+        self.concurrency = concurrency
+        self.errors = 0
+        self._on_error = on_error
+        self._queue: deque[Coroutine[Any, Any, Any]] = deque()
+        self._tasks: set[asyncio.Task[Any]] = set()
+
+    def __len__(self) -> int:
+        return len(self._queue) + len(self._tasks)
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> None:
+        """Queue coroutine, it is started when a slot is free."""
+        self._queue.append(coro)
+        self._start()
+
+    async def drain(self) -> None:
+        """Wait for running and queued callbacks."""
+        while self._tasks:
+            await asyncio.wait(set(self._tasks))
+
+    def _start(self) -> None:
+        while self._queue and len(self._tasks) < self.concurrency:
+            task = asyncio.create_task(self._queue.popleft())
+            self._tasks.add(task)
+            task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task[Any]) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            self.errors += 1
+            if self._on_error is None:
+                logger.error("Background trigger failed", exc_info=exc)
+            else:
+                self._on_error(exc)
+        self._start()
+
+
+default_runner = BackgroundRunner()
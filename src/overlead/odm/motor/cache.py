@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, NamedTuple, Protocol, TypeVar
+
+import bson
+from bson.errors import InvalidDocument
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Awaitable, Callable, Hashable
+
+    from bson.codec_options import CodecOptions
+
+__all__ = [
+    "DEFAULT_CACHE_SIZE",
+    "DEFAULT_CACHE_TTL",
+    "CacheBackend",
+    "CacheStats",
+    "CachedQuery",
+    "LRUCache",
+    "QueryCache",
+]
+
+T = TypeVar("T")
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = 60.0
+
+
+class CacheBackend(Protocol):
+    """Storage of `QueryCache` entries, values are never `None`."""
+
+    def get(self, key: Hashable) -> Any | None:
+        """Get value or `None` if missing or expired."""
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value."""
+
+    def clear(self) -> None:
+        """Remove all values."""
+
+
+class LRUCache:
+    """In-process backend, least recently used entries are evicted first."""
+
+    maxsize: int
+    ttl: float
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        ttl: float = DEFAULT_CACHE_TTL,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any | None:
+        """Get value or `None` if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires, value = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value, evict the oldest entries above `maxsize`."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all values."""
+        self._entries.clear()
+
+
+class CacheStats(NamedTuple):
+    """Hits and misses of cached queries."""
+
+    hits: int
+    misses: int
+
+    @property
+    def ratio(self) -> float:
+        """Hit ratio, `0.0` without queries."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class QueryCache:
+    """
+    Read-through cache of query results.
+
+    Keys are the collection, its generation, operation and BSON of the filter
+    (top level keys sorted), projection, sort, limit and other options.
+    Queries with a `session` or options not encodable to BSON are not cached.
+    Every write of this process through the model bumps the generation of the
+    collection, so older entries are never read again and age out of the
+    backend. Writes of other processes are seen after `ttl` at most.
+    """
+
+    backend: CacheBackend
+
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        *,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        ttl: float = DEFAULT_CACHE_TTL,
+    ) -> None:
+        self.backend = LRUCache(maxsize, ttl) if backend is None else backend
+        self._generations: Counter[str] = Counter()
+        self._hits: Counter[str] = Counter()
+        self._misses: Counter[str] = Counter()
+
+    def query(  # noqa: PLR0913
+        self,
+        namespace: str,
+        operation: str,
+        args: tuple[Any, ...],
+        kwargs: Mapping[str, Any],
+        codec_options: CodecOptions[Any],
+    ) -> CachedQuery | None:
+        """Get cached query, `None` if the query can not be cached."""
+        if kwargs.get("session") is not None:
+            return None
+
+        filter_ = args[0] if args else kwargs.get("filter")
+        if not isinstance(filter_, Mapping):
+            filter_ = {} if filter_ is None else {"_id": filter_}
+
+        options = {
+            "filter": dict(sorted(filter_.items())),
+            "args": list(args[1:]),
+            **{key: value for key, value in kwargs.items() if key != "filter"},
+        }
+        try:
+            query = bson.encode(options, codec_options=codec_options)
+        except (InvalidDocument, TypeError):
+            return None
+
+        key = (namespace, self._generations[namespace], operation, query)
+        return CachedQuery(self, namespace, key)
+
+    def invalidate(self, namespace: str) -> None:
+        """Drop cached results of collection."""
+        self._generations[namespace] += 1
+
+    async def invalidating(self, namespace: str, write: Awaitable[T]) -> T:
+        """Await write, then drop cached results of collection."""
+        try:
+            return await write
+        finally:
+            self.invalidate(namespace)
+
+    def stats(self, namespace: str | None = None) -> CacheStats:
+        """Hits and misses of collection or of all collections."""
+        if namespace is None:
+            return CacheStats(self._hits.total(), self._misses.total())
+        return CacheStats(self._hits[namespace], self._misses[namespace])
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self.backend.clear()
+
+
+class CachedQuery(NamedTuple):
+    """Query of `QueryCache` bound to the generation it started in."""
+
+    cache: QueryCache
+    namespace: str
+    key: tuple[Any, ...]
+
+    async def load(self, fetch: Callable[[], Awaitable[T]], *extra: Any) -> T:
+        """Get cached result or fetch and store it, `extra` is added to key."""
+        key = (*self.key, *extra)
+        entry = self.cache.backend.get(key)
+        if entry is not None:
+            self.cache._hits[self.namespace] += 1  # noqa: SLF001
+            value: T = entry[0]
+            return value
+
+        self.cache._misses[self.namespace] += 1  # noqa: SLF001
+        value = await fetch()
+        self.cache.backend.set(key, (value,))
+        return value
@@ -0,0 +1,499 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Generic,
+    Literal,
+    NamedTuple,
+    Protocol,
+    TypeAlias,
+    TypeVar,
+    cast,
+)
+from weakref import WeakKeyDictionary, WeakSet
+
+from bson import decode
+from bson.raw_bson import RawBSONDocument
+from pymongo.errors import OperationFailure, PyMongoError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import AsyncGenerator, Iterator, Mapping, Sequence
+
+    from bson import Timestamp
+    from motor.motor_asyncio import AsyncIOMotorChangeStream, AsyncIOMotorClient
+
+    from overlead.odm.motor.identity_map import IdentityMap
+    from overlead.odm.motor.model import MotorModel
+
+__all__ = [
+    "DEFAULT_EVENTS_BATCH_SIZE",
+    "DEFAULT_EVENTS_QUEUE_SIZE",
+    "ChangeEvent",
+    "ChangeWatcher",
+    "Materialized",
+    "MemoryTokenStore",
+    "ResumeTokenStore",
+    "UpdateDescription",
+    "watch_changes",
+]
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound="MotorModel")  # type: ignore[type-arg]
+
+DEFAULT_RECONNECT_DELAY = 1.0
+
+# Токен слишком старый: события уже вытеснены из oplog
+HISTORY_LOST_CODES = frozenset({136, 280, 286})
+
+DOCUMENT_EVENTS = frozenset({"insert", "update", "replace", "delete"})
+
+DEFAULT_EVENTS_BATCH_SIZE = 100
+DEFAULT_EVENTS_QUEUE_SIZE = 4
+DEFAULT_MAX_AWAIT_TIME_MS = 100
+
+Operation: TypeAlias = Literal["insert", "update", "replace", "delete"]
+
+_watchers: WeakKeyDictionary[Any, ChangeWatcher] = WeakKeyDictionary()
+
+
+class ResumeTokenStore(Protocol):
+    """Storage of change stream resume tokens."""
+
+    async def load(self, key: str) -> Mapping[str, Any] | None:
+        """Get stored token."""
+
+    async def save(self, key: str, token: Mapping[str, Any]) -> None:
+        """Store token."""
+
+
+class MemoryTokenStore:
+    """Resume tokens of this process, survive reconnects but not restarts."""
+
+    def __init__(self) -> None:
+        self._tokens: dict[str, Mapping[str, Any]] = {}
+
+    async def load(self, key: str) -> Mapping[str, Any] | None:
+        """Get stored token."""
+        return self._tokens.get(key)
+
+    async def save(self, key: str, token: Mapping[str, Any]) -> None:
+        """Store token."""
+        self._tokens[key] = token
+
+
+class UpdateDescription(NamedTuple):
+    """Fields changed by an `update` event."""
+
+    updated_fields: dict[str, Any]
+    removed_fields: list[str]
+    truncated_arrays: list[dict[str, Any]]
+
+
+class ChangeEvent(NamedTuple, Generic[T]):
+    """
+    Change of a model document.
+
+    `document` is loaded through the model: inserted and replaced documents,
+    updated ones only with `full_document`. `update` describes updates.
+    """
+
+    operation: Operation
+    id: Any
+    document: T | None
+    update: UpdateDescription | None
+    cluster_time: Timestamp | None
+    token: Mapping[str, Any]
+
+
+async def watch_changes(
+    model: type[T],
+    pipeline: Sequence[Mapping[str, Any]] = (),
+    *,
+    full_document: str | None = None,
+    resume_after: Mapping[str, Any] | None = None,
+    token_store: ResumeTokenStore | None = None,
+    token_key: str | None = None,
+    batch_size: int = DEFAULT_EVENTS_BATCH_SIZE,
+    queue_size: int = DEFAULT_EVENTS_QUEUE_SIZE,
+    max_await_time_ms: int = DEFAULT_MAX_AWAIT_TIME_MS,
+    trusted: bool | None = None,
+) -> AsyncGenerator[ChangeEvent[T], None]:
+    """
+    Yield changes of model collection.
+
+    Raw events are read in batches of up to `batch_size` (a batch is cut when
+    the server has nothing more for `max_await_time_ms`) and decoded at once
+    by a reader task. At most `queue_size` decoded batches wait for the
+    consumer, then reading stops until the consumer catches up. With
+    `token_store` the stream resumes from the stored token (`token_key`,
+    collection name by default), which is saved after each consumed batch.
+    Events other than insert, update, replace and delete are skipped.
+    """
+    key = model.collection.full_name if token_key is None else token_key
+    if resume_after is None and token_store is not None:
+        resume_after = await token_store.load(key)
+
+    stream = model._raw_collection.watch(  # noqa: SLF001
+        list(pipeline),
+        full_document=full_document,
+        resume_after=resume_after,
+        batch_size=batch_size,
+        max_await_time_ms=max_await_time_ms,
+    )
+    queue: asyncio.Queue[_Batch[T] | BaseException | None] = asyncio.Queue(queue_size)
+    reader = asyncio.create_task(_read(model, stream, queue, batch_size, trusted))
+
+    try:
+        while (batch := await _get(queue)) is not None:
+            for event in batch.events:
+                yield event
+            if token_store is not None and batch.token is not None:
+                await token_store.save(key, batch.token)
+    finally:
+        reader.cancel()
+        await asyncio.gather(reader, return_exceptions=True)
+        await stream.close()
+
+
+class _Batch(NamedTuple, Generic[T]):
+    events: list[ChangeEvent[T]]
+    token: Mapping[str, Any] | None
+
+
+async def _get(
+    queue: asyncio.Queue[_Batch[T] | BaseException | None],
+) -> _Batch[T] | None:
+    batch = await queue.get()
+    if isinstance(batch, BaseException):
+        raise batch
+    return batch
+
+
+async def _read(
+    model: type[T],
+    stream: AsyncIOMotorChangeStream,
+    queue: asyncio.Queue[_Batch[T] | BaseException | None],
+    batch_size: int,
+    trusted: bool | None,
+) -> None:
+    try:
+        while True:
+            changes = [await stream.next()]
+            while len(changes) < batch_size:
+                change = await stream.try_next()
+                if change is None:
+                    break
+                changes.append(change)
+
+            events = [
+                event
+                for change in changes
+                if (event := _event(model, change, trusted)) is not None
+            ]
+            await queue.put(_Batch(events, _plain(model, stream.resume_token)))
+    except StopAsyncIteration:
+        await queue.put(None)
+    except Exception as exc:  # noqa: BLE001
+        await queue.put(exc)
+
+
+def _event(
+    model: type[T],
+    change: Mapping[str, Any],
+    trusted: bool | None,
+) -> ChangeEvent[T] | None:
+    operation = change["operationType"]
+    if operation not in DOCUMENT_EVENTS:
+        return None
+
+    full = change.get("fullDocument")
+    document = None if full is None else model._load(full, trusted)  # noqa: SLF001
+
+    update = None
+    description = _plain(model, change.get("updateDescription"))
+    if description is not None:
+        update = UpdateDescription(
+            description.get("updatedFields") or {},
+            description.get("removedFields") or [],
+            description.get("truncatedArrays") or [],
+        )
+
+    return ChangeEvent(
+        cast(Operation, operation),
+        change["documentKey"]["_id"],
+        document,
+        update,
+        change.get("clusterTime"),
+        _plain(model, change["_id"]),
+    )
+
+
+def _plain(model: type[T], value: Any) -> Any:
+    # события сырых коллекций приходят как RawBSONDocument
+    if isinstance(value, RawBSONDocument):
+        return decode(value.raw, model._codec_options)  # noqa: SLF001
+    return value
+
+
+class Materialized(Generic[T]):
+    """
+    In-memory copy of a small collection kept current by `ChangeWatcher`.
+
+    Raw documents are stored, `get` and iteration create new models.
+    `staleness` is the time since the last applied change or load. Changes
+    before the load are ignored, the load reads them from the collection.
+    """
+
+    model: type[T]
+    loaded_at: float | None
+    updated_at: float | None
+
+    def __init__(self, model: type[T]) -> None:
+        self.model = model
+        self.loaded_at = None
+        self.updated_at = None
+        self._documents: dict[Any, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __iter__(self) -> Iterator[T]:
+        for item in list(self._documents.values()):
+            yield self.model._load(item)  # noqa: SLF001
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the collection is loaded."""
+        return self.loaded_at is not None
+
+    @property
+    def staleness(self) -> float | None:
+        """Seconds since the last change was applied, `None` if not loaded."""
+        if self.loaded_at is None or self.updated_at is None:
+            return None
+        return time.monotonic() - self.updated_at
+
+    def get(self, id_: Any) -> T | None:
+        """Get model by id."""
+        item = self._documents.get(id_)
+        return None if item is None else self.model._load(item)  # noqa: SLF001
+
+    async def load(self) -> None:
+        """Load all documents of collection."""
+        items = await self.model._raw_collection.find({}).to_list(None)  # noqa: SLF001
+        self._documents = {item["_id"]: item for item in items}
+        self.loaded_at = self.updated_at = time.monotonic()
+
+    def reset(self) -> None:
+        """Mark copy as outdated, it is loaded again by the watcher."""
+        self.loaded_at = None
+
+    def apply(self, change: Mapping[str, Any]) -> None:
+        """Apply change event with `fullDocument`, ignored until loaded."""
+        if self.loaded_at is None:
+            return
+
+        id_ = change["documentKey"]["_id"]
+        document = change.get("fullDocument")
+        if change["operationType"] == "delete" or document is None:
+            self._documents.pop(id_, None)
+        else:
+            self._documents[id_] = document
+        self.updated_at = time.monotonic()
+
+
+class ChangeWatcher:
+    """
+    Change stream of a client evicting cached data of watched models.
+
+    One stream (`client.watch()`) covers all watched collections. On changes
+    `Meta.query_cache` of the collection is invalidated, changed documents are
+    evicted from attached identity maps and applied to materialized copies.
+    The resume token is saved after every change and used after reconnects;
+    if it is too old everything is invalidated and materialized copies are
+    reloaded.
+    """
+
+    client: AsyncIOMotorClient
+    token_store: ResumeTokenStore
+    key: str
+    reconnect_delay: float
+
+    def __init__(
+        self,
+        client: AsyncIOMotorClient,
+        *,
+        token_store: ResumeTokenStore | None = None,
+        key: str = "default",
+        reconnect_delay: float = DEFAULT_RECONNECT_DELAY,
+    ) -> None:
+        self.client = client
+        self.token_store = MemoryTokenStore() if token_store is None else token_store
+        self.key = key
+        self.reconnect_delay = reconnect_delay
+        self._models: defaultdict[tuple[str, str], list[type[MotorModel[Any]]]]
+        self._models = defaultdict(list)
+        self._materialized: dict[tuple[str, str], Materialized[Any]] = {}
+        self._identity_maps: WeakSet[IdentityMap] = WeakSet()
+        self._task: asyncio.Task[None] | None = None
+
+    @staticmethod
+    def of(client: AsyncIOMotorClient) -> ChangeWatcher:
+        """Get the shared watcher of client."""
+        if client not in _watchers:
+            _watchers[client] = ChangeWatcher(client)
+        return _watchers[client]
+
+    def watch(
+        self,
+        model: type[T],
+        *,
+        materialize: bool = False,
+    ) -> Materialized[T] | None:
+        """
+        Watch model collection, with `materialize` get its in-memory copy.
+
+        Models are watched from the next (re)start of the stream.
+        """
+        namespace = (model.database_name, model.collection_name)
+        if model not in self._models[namespace]:
+            self._models[namespace].append(model)
+
+        if not materialize:
+            return self._materialized.get(namespace)
+        return self._materialized.setdefault(namespace, Materialized(model))
+
+    def attach(self, imap: IdentityMap) -> None:
+        """Evict changed documents from identity map while it is alive."""
+        self._identity_maps.add(imap)
+
+    @property
+    def pipeline(self) -> list[dict[str, Any]]:
+        """Stage selecting changes of watched collections."""
+        return [
+            {
+                "$match": {
+                    "$or": [
+                        {"ns.db": database, "ns.coll": collection}
+                        for database, collection in self._models
+                    ],
+                },
+            },
+        ]
+
+    def apply(self, change: Mapping[str, Any]) -> None:
+        """Evict data changed by change event."""
+        ns: Mapping[str, str] = change.get("ns") or {}
+        namespace = (ns.get("db", ""), ns.get("coll", ""))
+        models = self._models.get(namespace, [])
+
+        if change["operationType"] not in DOCUMENT_EVENTS:
+            # drop, rename, dropDatabase, invalidate
+            for model in models:
+                _invalidate_cache(model)
+            materialized = self._materialized.get(namespace)
+            if materialized is not None:
+                materialized.reset()
+            return
+
+        id_ = change["documentKey"]["_id"]
+        for model in models:
+            _invalidate_cache(model)
+            for imap in self._identity_maps:
+                imap.discard_id(model, id_)
+
+        materialized = self._materialized.get(namespace)
+        if materialized is not None:
+            materialized.apply(change)
+
+    def invalidate_all(self) -> None:
+        """Drop everything cached of watched models."""
+        for models in self._models.values():
+            for model in models:
+                _invalidate_cache(model)
+                for imap in self._identity_maps:
+                    imap.discard_model(model)
+        for materialized in self._materialized.values():
+            materialized.reset()
+
+    def start(self) -> asyncio.Task[None]:
+        """Run watcher in a task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the watcher task."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run(self) -> None:
+        """Tail changes, reconnect after errors."""
+        if not self._models:
+            logger.warning("No watched models, change stream is not started")
+            return
+
+        while True:
+            try:
+                await self._run()
+            except PyMongoError as exc:
+                logger.warning("Change stream failed, reconnecting: %r", exc)
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def _run(self) -> None:
+        token = await self.token_store.load(self.key)
+        stream = self._open(token)
+        try:
+            # открываем курсор сразу, изменения после этого момента не потеряются
+            change = await stream.try_next()
+        except OperationFailure as exc:
+            await stream.close()
+            if token is None or exc.code not in HISTORY_LOST_CODES:
+                raise
+            logger.warning("Change stream history lost, reloading: %r", exc)
+            token = None
+            stream = self._open(None)
+            change = await stream.try_next()
+
+        async with stream:
+            if token is None:
+                self.invalidate_all()
+
+            while True:
+                if change is not None:
+                    self.apply(change)
+                if stream.resume_token is not None:
+                    await self.token_store.save(self.key, stream.resume_token)
+
+                await self._load_materialized()
+                change = await stream.try_next()
+
+    def _open(self, token: Mapping[str, Any] | None) -> AsyncIOMotorChangeStream:
+        return self.client.watch(
+            self.pipeline,
+            full_document="updateLookup",
+            resume_after=token,
+        )
+
+    async def _load_materialized(self) -> None:
+        await asyncio.gather(
+            *(
+                materialized.load()
+                for materialized in self._materialized.values()
+                if not materialized.loaded
+            ),
+        )
+
+
+def _invalidate_cache(model: type[MotorModel[Any]]) -> None:
+    cache = model.__meta__.query_cache
+    if cache is not None:
+        cache.invalidate(model.collection.full_name)
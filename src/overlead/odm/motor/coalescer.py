@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any, TypeAlias
+
+from pymongo.errors import BulkWriteError, WriteError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Awaitable, Callable
+
+    from pymongo import InsertOne, UpdateOne
+    from pymongo.results import BulkWriteResult
+
+__all__ = ["WriteCoalescer"]
+
+Request: TypeAlias = "InsertOne[dict[str, Any]] | UpdateOne"
+_Pending: TypeAlias = "list[tuple[Request, asyncio.Future[None]]]"
+
+
+class WriteCoalescer:
+    """
+    Write-behind queue merging concurrent writes into one `bulk_write`.
+
+    Pending requests are sent unordered when `max_batch` of them are queued or
+    `delay` seconds after the first one. Every caller gets the outcome of its
+    own request: `None` or the `WriteError` of this request. Writes of one
+    document queued in the same batch may be applied in any order.
+    """
+
+    max_batch: int
+    delay: float
+
+    def __init__(
+        self,
+        bulk_write: Callable[[list[Request]], Awaitable[BulkWriteResult]],
+        max_batch: int,
+        delay: float,
+    ) -> None:
+        self.max_batch = max_batch
+        self.delay = delay
+        self._bulk_write = bulk_write
+        self._pending: _Pending = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def write(self, request: Request) -> asyncio.Future[None]:
+        """Queue request, the future is resolved when it is written."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+        self._pending.append((request, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._send_pending()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.delay, self._send_pending)
+
+        return future
+
+    async def flush(self) -> None:
+        """Send pending requests and wait for all requests in flight."""
+        self._send_pending()
+        if self._tasks:
+            await asyncio.wait(self._tasks)
+
+    def _send_pending(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.create_task(self._send(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, pending: _Pending) -> None:
+        try:
+            await self._bulk_write([request for request, _ in pending])
+        except BulkWriteError as exc:
+            errors = {error["index"]: error for error in exc.details["writeErrors"]}
+            for index, (_, future) in enumerate(pending):
+                error = errors.get(index)
+                if error is not None:
+                    _resolve(future, WriteError(error["errmsg"], error["code"], error))
+                elif exc.details.get("writeConcernErrors"):
+                    _resolve(future, exc)
+                else:
+                    _resolve(future)
+        except Exception as exc:  # noqa: BLE001
+            for _, future in pending:
+                _resolve(future, exc)
+        else:
+            for _, future in pending:
+                _resolve(future)
+
+
+def _resolve(future: asyncio.Future[None], exc: BaseException | None = None) -> None:
+    if future.done():
+        # caller was cancelled
+        return
+    if exc is None:
+        future.set_result(None)
+    else:
+        future.set_exception(exc)
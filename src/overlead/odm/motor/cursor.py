@@ -1,35 +1,172 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Generic, TypeVar
+import asyncio
+from typing import TYPE_CHECKING, Any, Generic, Self, TypeVar
+
+from bson.raw_bson import RawBSONDocument
+
+from .identity_map import IdentityMap
+from .references import resolve_references
 
 if TYPE_CHECKING:  # pragma: no cover
-    from collections.abc import AsyncGenerator, AsyncIterator
+    from collections.abc import AsyncGenerator, AsyncIterator, Sequence
+    from concurrent.futures import Executor
 
     from motor.motor_asyncio import AsyncIOMotorCursor
 
+    from overlead.odm.motor.cache import CachedQuery
     from overlead.odm.motor.model import MotorModel
 
 T = TypeVar("T", bound="MotorModel")  # type: ignore[type-arg]
 
+DEFAULT_BATCH_SIZE = 100
+
+
+def _load_batch(
+    model: type[T],
+    items: Sequence[Any],
+    trusted: bool | None,
+    fields: frozenset[str] | None,
+) -> list[T]:
+    """Load batch of documents, raw BSON may come from a worker process."""
+    codec_options = model._raw_codec_options  # noqa: SLF001
+    return [
+        model._load(  # noqa: SLF001
+            RawBSONDocument(item, codec_options) if isinstance(item, bytes) else item,
+            trusted,
+            fields,
+        )
+        for item in items
+    ]
+
 
 class MotorCursor(Generic[T]):
-    """Motor cursor."""
+    """
+    Motor cursor.
+
+    With `executor` documents are decoded in batches of `batch_size` in the
+    executor, off the event loop. The next batch is fetched while the previous
+    one is decoded, results are yielded in cursor order. Process pools get raw
+    BSON of the documents, so the model must be importable by the workers.
+    References in `prefetch` fields are resolved per batch. With `cache`
+    the raw documents of `to_list` are cached, iteration is not.
+    """
 
     model: type[T]
     cursor: AsyncIOMotorCursor
+    trusted: bool | None
+    fields: frozenset[str] | None
+    executor: Executor | None
+    batch_size: int
+    prefetch_fields: tuple[str, ...]
+    cache: CachedQuery | None
 
-    def __init__(self, model: type[T], cursor: AsyncIOMotorCursor) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        model: type[T],
+        cursor: AsyncIOMotorCursor,
+        trusted: bool | None = None,
+        fields: frozenset[str] | None = None,
+        executor: Executor | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        cache: CachedQuery | None = None,
+    ) -> None:
         self.model = model
         self.cursor = cursor
+        self.trusted = trusted
+        self.fields = fields
+        self.executor = executor
+        self.batch_size = batch_size
+        self.prefetch_fields = ()
+        self.cache = cache
+
+    def prefetch(self, *fields: str) -> Self:
+        """Resolve references in `fields` of loaded documents."""
+        self.prefetch_fields += fields
+        return self
 
     def __aiter__(self) -> AsyncIterator[T]:
         async def iterate() -> AsyncGenerator[T, None]:
+            imap = self._identity_map()
             async for item in self.cursor:
-                yield self.model._load(item)  # noqa: SLF001
+                doc = self.model._load(item, self.trusted, self.fields)  # noqa: SLF001
+                yield doc if imap is None else imap.add(doc)
+
+        async def iterate_batches() -> AsyncGenerator[T, None]:
+            pending: asyncio.Future[list[T]] | None = None
+            async for batch in self._batches():
+                decoding = self._decode(batch)
+                if pending is not None:
+                    for doc in await self._finish(await pending):
+                        yield doc
+                pending = decoding
 
-        return iterate()
+            if pending is not None:
+                for doc in await self._finish(await pending):
+                    yield doc
+
+        if self.executor is None and not self.prefetch_fields:
+            return iterate()
+        return iterate_batches()
 
     async def to_list(self, length: int | None) -> list[T]:
         """To list."""
-        items = await self.cursor.to_list(length=length)
-        return [self.model._load(item) for item in items]  # noqa: SLF001
+        if self.cache is None:
+            items = await self.cursor.to_list(length=length)
+        else:
+            items = await self.cache.load(
+                lambda: self.cursor.to_list(length=length),
+                length,
+            )
+        if self.executor is None:
+            docs = _load_batch(self.model, items, self.trusted, self.fields)
+        else:
+            batches = await asyncio.gather(
+                *(
+                    self._decode(items[i : i + self.batch_size])
+                    for i in range(0, len(items), self.batch_size)
+                ),
+            )
+            docs = [doc for batch in batches for doc in batch]
+
+        return await self._finish(docs)
+
+    async def _finish(self, docs: list[T]) -> list[T]:
+        docs = self._identities(docs)
+        if self.prefetch_fields:
+            await resolve_references(docs, *self.prefetch_fields)
+        return docs
+
+    def _identity_map(self) -> IdentityMap | None:
+        # partial models are not stored in the identity map
+        return IdentityMap.current() if self.fields is None else None
+
+    def _identities(self, docs: list[T]) -> list[T]:
+        imap = self._identity_map()
+        if imap is None:
+            return docs
+        return [imap.add(doc) for doc in docs]
+
+    async def _batches(self) -> AsyncGenerator[list[Any], None]:
+        while batch := await self.cursor.to_list(length=self.batch_size):
+            yield batch
+
+    def _decode(self, batch: Sequence[Any]) -> asyncio.Future[list[T]]:
+        if self.executor is None:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(
+                _load_batch(self.model, batch, self.trusted, self.fields),
+            )
+            return future
+
+        items = [
+            item.raw if isinstance(item, RawBSONDocument) else item for item in batch
+        ]
+        return asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            _load_batch,
+            self.model,
+            items,
+            self.trusted,
+            self.fields,
+        )
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from collections.abc import Hashable, Mapping
+from contextvars import ContextVar, Token
+from typing import TYPE_CHECKING, Any, Self, TypeVar
+
+if TYPE_CHECKING:  # pragma: no cover
+    from types import TracebackType
+
+    from overlead.odm.model import BaseModel
+
+__all__ = ["IdentityMap"]
+
+M = TypeVar("M", bound="BaseModel")  # type: ignore[type-arg]
+
+_current: ContextVar[IdentityMap | None] = ContextVar("identity_map", default=None)
+
+
+class IdentityMap:
+    """
+    Documents loaded in the current context, one instance per `_id`.
+
+    Inside `with IdentityMap():` `find_one({"_id": ...})` (and so
+    `Reference.load()`) returns the already loaded instance without a query,
+    `find`, `find_one` and `save` fill the map, `delete` evicts from it.
+    Partial models (`fields=`) are not stored.
+    """
+
+    hits: int
+    misses: int
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._documents: dict[tuple[type[Any], Any], Any] = {}
+        self._tokens: list[Token[IdentityMap | None]] = []
+
+    @staticmethod
+    def current() -> IdentityMap | None:
+        """Get identity map of the current context."""
+        return _current.get()
+
+    def __enter__(self) -> Self:
+        self._tokens.append(_current.set(self))
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        _current.reset(self._tokens.pop())
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def get(self, model: type[M], id_: Any) -> M | None:
+        """Get loaded document, counts hits and misses."""
+        doc: M | None = self._documents.get((model, id_))
+        if doc is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return doc
+
+    def add(self, doc: M) -> M:
+        """Store loaded document, the instance already in the map wins."""
+        stored: M = self._documents.setdefault((type(doc), doc.id), doc)
+        return stored
+
+    def put(self, doc: M) -> None:
+        """Store saved document, replacing the previous instance."""
+        self._documents[type(doc), doc.id] = doc
+
+    def discard(self, doc: BaseModel[Any]) -> None:
+        """Evict document."""
+        self._documents.pop((type(doc), doc.id), None)
+
+    def discard_id(self, model: type[BaseModel[Any]], id_: Any) -> None:
+        """Evict document of model by id."""
+        self._documents.pop((model, id_), None)
+
+    def discard_model(self, model: type[BaseModel[Any]]) -> None:
+        """Evict all documents of model."""
+        for key in [key for key in self._documents if key[0] is model]:
+            del self._documents[key]
+
+    def clear(self) -> None:
+        """Evict all documents."""
+        self._documents.clear()
+
+
+def filter_id(filter: Any) -> Any:  # noqa: A002
+    """Get `_id` from `{"_id": value}` filter or `None` for other filters."""
+    if not isinstance(filter, Mapping) or len(filter) != 1:
+        return None
+
+    id_ = filter.get("_id")
+    if isinstance(id_, Mapping) or not isinstance(id_, Hashable):
+        return None
+    return id_
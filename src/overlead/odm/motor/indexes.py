@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from pymongo import IndexModel
+
+from overlead.odm.errors import IndexRebuildError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable, Mapping
+
+    from motor.motor_asyncio import (
+        AsyncIOMotorClientSession,
+        AsyncIOMotorCollection,
+        AsyncIOMotorDatabase,
+    )
+
+    from overlead.odm.index import Index
+
+__all__ = [
+    "DEFAULT_INDEX_CONCURRENCY",
+    "STAGED_SUFFIX",
+    "IndexPlan",
+    "IndexReport",
+    "apply_index_plan",
+    "ensure_collection_indexes",
+    "plan_collection_indexes",
+]
+
+DEFAULT_INDEX_CONCURRENCY = 8
+
+ID_INDEX = "_id_"
+STAGED_SUFFIX = "_staged"
+
+
+class IndexReport(NamedTuple):
+    """Index names created, skipped as existing and conflicting with existing."""
+
+    collection: str
+    created: tuple[str, ...]
+    skipped: tuple[str, ...]
+    conflicts: tuple[str, ...]
+
+
+async def list_indexes(
+    collection: AsyncIOMotorCollection,
+    session: AsyncIOMotorClientSession | None = None,
+) -> dict[str, Mapping[str, Any]]:
+    """Get existing indexes of collection by name."""
+    return {
+        info["name"]: info
+        async for info in collection.list_indexes(session=session)
+    }
+
+
+def find_existing(
+    index: Index,
+    existing: dict[str, Mapping[str, Any]],
+) -> Mapping[str, Any] | None:
+    """Get existing index with the same name or, under another name, key."""
+    info = existing.get(index.name)
+    if info is not None:
+        return info
+
+    key = list(index.key.items())
+    for info in existing.values():
+        if list(info["key"].items()) == key:
+            return info
+    return None
+
+
+async def ensure_collection_indexes(
+    collection: AsyncIOMotorCollection,
+    indexes: Iterable[Index],
+    session: AsyncIOMotorClientSession | None = None,
+) -> IndexReport:
+    """
+    Create missing indexes of collection with one `create_indexes`.
+
+    Existing indexes are listed once. Indexes existing with the same spec
+    (possibly under another name, like `_id_`) are skipped, with the same name
+    or key but another spec are conflicts and are left as is, see
+    `plan_collection_indexes` to rebuild them.
+    """
+    existing = await list_indexes(collection, session)
+
+    models: dict[str, IndexModel] = {}
+    skipped: list[str] = []
+    conflicts: list[str] = []
+    for index in indexes:
+        name = index.name
+        if name in models or name in skipped or name in conflicts:
+            continue
+
+        info = find_existing(index, existing)
+        if info is None:
+            models[name] = IndexModel(
+                list(index.keys.__root__.items()),
+                **index.options(),
+            )
+        elif index.diff(info):
+            conflicts.append(name)
+        else:
+            skipped.append(name)
+
+    if models:
+        await collection.create_indexes(list(models.values()), session=session)
+
+    return IndexReport(
+        collection.name,
+        tuple(models),
+        tuple(skipped),
+        tuple(conflicts),
+    )
+
+
+class IndexPlan(NamedTuple):
+    """
+    Changes of collection indexes to match the declared ones.
+
+    `rebuild` pairs the existing index name with the declared index having
+    another key or options, `modify` has indexes differing only by `hidden`,
+    `drop` has names of existing indexes not declared.
+    """
+
+    collection: str
+    create: tuple[Index, ...]
+    rebuild: tuple[tuple[str, Index], ...]
+    modify: tuple[Index, ...]
+    drop: tuple[str, ...]
+
+    @property
+    def empty(self) -> bool:
+        """Whether indexes already match."""
+        return not (self.create or self.rebuild or self.modify or self.drop)
+
+
+async def plan_collection_indexes(
+    collection: AsyncIOMotorCollection,
+    indexes: Iterable[Index],
+    session: AsyncIOMotorClientSession | None = None,
+) -> IndexPlan:
+    """Diff declared indexes with existing indexes of collection."""
+    existing = await list_indexes(collection, session)
+
+    declared: dict[str, Index] = {}
+    create: list[Index] = []
+    rebuild: list[tuple[str, Index]] = []
+    modify: list[Index] = []
+    matched = {ID_INDEX}
+    for index in indexes:
+        if index.name in declared:
+            continue
+        declared[index.name] = index
+
+        info = find_existing(index, existing)
+        if info is None:
+            create.append(index)
+            continue
+
+        matched.add(info["name"])
+        diff = index.diff(info)
+        if diff == {"hidden"}:
+            modify.append(index)
+        elif diff:
+            rebuild.append((info["name"], index))
+
+    return IndexPlan(
+        collection.name,
+        tuple(create),
+        tuple(rebuild),
+        tuple(modify),
+        tuple(name for name in existing if name not in matched),
+    )
+
+
+async def apply_index_plan(
+    collection: AsyncIOMotorCollection,
+    plan: IndexPlan,
+    *,
+    drop: bool = False,
+    hidden_staging: bool = True,
+    session: AsyncIOMotorClientSession | None = None,
+) -> None:
+    """
+    Apply plan as rolling builds, one index of collection at a time.
+
+    With `hidden_staging` indexes are built hidden and unhidden together after
+    all builds succeed, a failed apply leaves new indexes unused by queries.
+    A rebuilt index with another key is built next to the old one, the old
+    one is dropped last. If the name is the same, the new index is staged
+    under `STAGED_SUFFIX` and built again under its name after the old one is
+    dropped. The same key can not be indexed twice, so the old index is
+    dropped right before the build and a spare index of the key and `_id`
+    serves queries meanwhile; unique indexes can not be rebuilt in place as
+    uniqueness would not be enforced meanwhile (`IndexRebuildError`).
+    Undeclared indexes are dropped only with `drop`.
+    """
+    existing = await list_indexes(collection, session) if plan.rebuild else {}
+    for name, index in plan.rebuild:
+        info = existing.get(name)
+        if info is not None and _same_key(info, index) and info.get("unique"):
+            raise IndexRebuildError(name)
+
+    for index in plan.modify:
+        await _set_hidden(
+            collection,
+            index.name,
+            hidden=bool(index.opts.hidden),
+            session=session,
+        )
+
+    rollout = _Rollout(collection, session, hidden_staging=hidden_staging)
+    for name, index in plan.rebuild:
+        await rollout.rebuild(name, index, existing.get(name))
+    for index in plan.create:
+        await rollout.build(index, index.name)
+    await rollout.finish()
+
+    if drop:
+        for name in plan.drop:
+            await collection.drop_index(name, session=session)
+
+
+def _same_key(info: Mapping[str, Any], index: Index) -> bool:
+    return list(info["key"].items()) == list(index.key.items())
+
+
+class _Rollout:
+    """Index builds of `apply_index_plan`, cleaned up after all succeed."""
+
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        session: AsyncIOMotorClientSession | None,
+        *,
+        hidden_staging: bool,
+    ) -> None:
+        self.collection = collection
+        self.session = session
+        self.hidden_staging = hidden_staging
+        self.staged: list[str] = []
+        self.obsolete: list[str] = []
+        self.renamed: list[Index] = []
+
+    async def build(self, index: Index, name: str) -> None:
+        """Build index under `name`, hidden until `finish` with staging."""
+        options = {**index.options(), "name": name}
+        if self.hidden_staging and not options.get("hidden"):
+            options["hidden"] = True
+            self.staged.append(name)
+
+        await self.collection.create_index(
+            list(index.keys.__root__.items()),
+            session=self.session,
+            **options,
+        )
+
+    async def rebuild(
+        self,
+        name: str,
+        index: Index,
+        info: Mapping[str, Any] | None,
+    ) -> None:
+        """Build `index` replacing existing index `name`."""
+        if info is not None and _same_key(info, index):
+            await self._replace_in_place(name, index)
+            await self.build(index, index.name)
+            return
+
+        self.obsolete.append(name)
+        if index.name == name:
+            self.renamed.append(index)
+            await self.build(index, index.name + STAGED_SUFFIX)
+        else:
+            await self.build(index, index.name)
+
+    async def finish(self) -> None:
+        """Unhide staged indexes, drop replaced ones, rename staged rebuilds."""
+        for name in self.staged:
+            await _set_hidden(self.collection, name, hidden=False, session=self.session)
+
+        for name in self.obsolete:
+            await self.collection.drop_index(name, session=self.session)
+
+        for index in self.renamed:
+            await self.collection.create_index(
+                list(index.keys.__root__.items()),
+                session=self.session,
+                **{**index.options(), "name": index.name},
+            )
+            await self.collection.drop_index(
+                index.name + STAGED_SUFFIX,
+                session=self.session,
+            )
+
+    async def _replace_in_place(self, name: str, index: Index) -> None:
+        # тот же ключ дважды не проиндексировать, запросы пока обслуживает
+        # запасной индекс по ключу и `_id`
+        if "_id" not in index.keys.__root__:
+            spare = index.name + STAGED_SUFFIX
+            await self.collection.create_index(
+                [*index.keys.__root__.items(), ("_id", 1)],
+                name=spare,
+                session=self.session,
+            )
+            self.obsolete.append(spare)
+        await self.collection.drop_index(name, session=self.session)
+
+
+async def _set_hidden(
+    collection: AsyncIOMotorCollection,
+    name: str,
+    *,
+    hidden: bool,
+    session: AsyncIOMotorClientSession | None,
+) -> None:
+    database: AsyncIOMotorDatabase = collection.database  # type: ignore[assignment]
+    await database.command(
+        "collMod",
+        collection.name,
+        index={"name": name, "hidden": hidden},
+        session=session,
+    )
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Generic, NamedTuple, TypeVar
+
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_GENERIC, SHAPE_SINGLETON
+from pydantic.utils import lenient_issubclass
+
+from overlead.odm.errors import ModelFieldError
+from overlead.odm.fields import Reference
+
+from .references import collect_references
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pydantic.fields import ModelField
+
+    from overlead.odm.motor.model import MotorModel
+
+__all__ = ["Lookup"]
+
+T = TypeVar("T", bound="MotorModel")  # type: ignore[type-arg]
+
+LOOKUP_PREFIX = "__lookup_"
+
+
+class _Join(NamedTuple):
+    path: tuple[str, ...]
+    local_field: str
+    target: type[MotorModel[Any]]
+    single: bool
+    key: str
+
+
+class Lookup(Generic[T]):
+    """
+    Server-side join of `Reference` fields.
+
+    `pipeline` has a `$lookup` from the referenced model collection for every
+    field (dotted paths through nested models and lists are supported) and
+    `$unwind` for single references. `load` creates the model from a joined
+    document and attaches the joined documents as `Reference.document`.
+    """
+
+    model: type[T]
+    joins: tuple[_Join, ...]
+
+    def __init__(self, model: type[T], *fields: str) -> None:
+        self.model = model
+        self.joins = tuple(
+            _get_join(model, tuple(field.split(".")), f"{LOOKUP_PREFIX}{index}")
+            for index, field in enumerate(fields)
+        )
+
+    @property
+    def pipeline(self) -> list[dict[str, Any]]:
+        """Aggregation stages joining referenced documents."""
+        stages: list[dict[str, Any]] = []
+        for join in self.joins:
+            stages.append(
+                {
+                    "$lookup": {
+                        "from": join.target.collection_name,
+                        "localField": join.local_field,
+                        "foreignField": "_id",
+                        "as": join.key,
+                    },
+                },
+            )
+            if join.single:
+                stages.append(
+                    {
+                        "$unwind": {
+                            "path": f"${join.key}",
+                            "preserveNullAndEmptyArrays": True,
+                        },
+                    },
+                )
+        return stages
+
+    def load(self, item: Mapping[str, Any], trusted: bool | None = None) -> T:
+        """Create model from joined document."""
+        data = dict(item)
+        joined = [data.pop(join.key, None) for join in self.joins]
+        doc = self.model._load(data, trusted)  # noqa: SLF001
+
+        for join, values in zip(self.joins, joined, strict=True):
+            if isinstance(values, Mapping):
+                values = [values]  # noqa: PLW2901
+            documents = {
+                value["_id"]: join.target._load(value, trusted)  # noqa: SLF001
+                for value in values or ()
+            }
+            for ref, _ in collect_references(doc, join.path):
+                ref.document = documents.get(ref)
+
+        return doc
+
+
+def _get_join(model: type[BaseModel], path: tuple[str, ...], key: str) -> _Join:
+    aliases: list[str] = []
+    single = True
+    current: Any = model
+
+    for index, name in enumerate(path):
+        if not lenient_issubclass(current, BaseModel) or name not in current.__fields__:
+            raise ModelFieldError(".".join(path))
+
+        field: ModelField = current.__fields__[name]
+        aliases.append(field.alias)
+        while field.shape not in (SHAPE_SINGLETON, SHAPE_GENERIC) and field.sub_fields:
+            single = False
+            field = field.sub_fields[0]
+
+        if lenient_issubclass(field.type_, Reference):
+            if index != len(path) - 1 or not field.sub_fields:
+                raise ModelFieldError(".".join(path))
+            target = field.sub_fields[0].type_
+            return _Join(path, ".".join(aliases), target, single, key)
+
+        current = field.type_
+
+    raise ModelFieldError(".".join(path))
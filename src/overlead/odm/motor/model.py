@@ -2,22 +2,32 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from collections import defaultdict
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from typing import (
     IO,
     TYPE_CHECKING,
     Any,
     Generic,
+    NamedTuple,
     ParamSpec,
     Self,
     TypeAlias,
     TypeVar,
 )
 
-from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorGridFSBucket
+from bson import decode, encode
+from motor.motor_asyncio import (
+    AsyncIOMotorClientSession,
+    AsyncIOMotorCollection,
+    AsyncIOMotorGridFSBucket,
+)
+from pymongo import InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 
 from overlead.odm import triggers
-from overlead.odm.errors import ModelNotCreatedError
+from overlead.odm.errors import ModelNotCreatedError, ModelUpsertKeyError
 from overlead.odm.fields import ObjectId
 from overlead.odm.model import BaseModel
 from overlead.odm.types import (
@@ -27,20 +37,56 @@ from overlead.odm.types import (
     isundefined,
     undefined,
 )
+from overlead.odm.utils import abatched
 
-from .cursor import MotorCursor
+from .advisor import QueryAdvisor
+from .background import BackgroundRunner, default_runner
+from .changes import (
+    DEFAULT_EVENTS_BATCH_SIZE,
+    DEFAULT_EVENTS_QUEUE_SIZE,
+    watch_changes,
+)
+from .coalescer import WriteCoalescer
+from .cursor import DEFAULT_BATCH_SIZE, MotorCursor
+from .identity_map import IdentityMap, filter_id
+from .indexes import (
+    DEFAULT_INDEX_CONCURRENCY,
+    IndexPlan,
+    IndexReport,
+    apply_index_plan,
+    ensure_collection_indexes,
+    plan_collection_indexes,
+)
+from .lookup import Lookup
+from .pagination import DEFAULT_PAGE_SIZE, paginate
+from .references import DEFAULT_CHUNK_SIZE, resolve_references
+from .scan import (
+    DEFAULT_PARTITIONS,
+    DEFAULT_SCAN_QUEUE_SIZE,
+    parallel_scan,
+    scan_partitions,
+)
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable, Sequence
+    from collections.abc import (
+        AsyncGenerator,
+        AsyncIterable,
+        AsyncIterator,
+        Awaitable,
+        Callable,
+        Collection,
+        Iterable,
+        Mapping,
+        Sequence,
+    )
+    from concurrent.futures import Executor
 
     from motor.core import AgnosticClientSession
     from pymongo import (
         DeleteMany,
         DeleteOne,
-        InsertOne,
         ReplaceOne,
         UpdateMany,
-        UpdateOne,
     )
     from pymongo.results import (
         BulkWriteResult,
@@ -50,77 +96,356 @@ if TYPE_CHECKING:
         UpdateResult,
     )
 
-    from overlead.odm.triggers import trigger
+    from overlead.odm.index import Index
+    from overlead.odm.motor.cache import CachedQuery
+    from overlead.odm.motor.changes import ChangeEvent, ResumeTokenStore
+    from overlead.odm.motor.pagination import Page
+    from overlead.odm.triggers import batch_trigger, trigger
 
 
-__all__ = ["MotorModel", "ObjectIdModel"]
+__all__ = ["InsertBatch", "MotorModel", "ObjectIdModel"]
 
 _IdType = TypeVar("_IdType", covariant=True)
 _P = ParamSpec("_P")
+_R = TypeVar("_R")
 _DocumentType: TypeAlias = dict[str, Any]
 _MotorModelType: TypeAlias = BaseModel[_IdType]
 
 logger = logging.getLogger()
 
+DEFAULT_SAVE_BATCH_SIZE = 1000
+DEFAULT_MAX_IN_FLIGHT = 4
+
+
+class InsertBatch(NamedTuple):
+    """Result of a batch of `insert_stream`."""
+
+    start: int
+    size: int
+    result: InsertManyResult
+
 
 class MotorModel(_MotorModelType[_IdType], Generic[_IdType]):
     """Base class for MongoDB models."""
 
     async def save(self) -> Self:
         """Save model."""
-        await self.run_triggers(triggers.before_save)
-
-        if not self.is_created:
-            await self.run_triggers(triggers.before_create)
+        created = await self._before_save()
+        coalescer = self._coalescer
 
+        if coalescer is not None:
+            request, olds = self._save_request(created=created)
+            if request is not None:
+                await coalescer.write(request)
+            self._mark_saved(olds, created=created)
+        elif created:
             data = self._dump()
-
             result = await self.insert_one(data)
-            self.id = result.inserted_id
-            self._olds = data
-            self._olds["_id"] = self.id
+            data["_id"] = result.inserted_id
+            self._mark_saved(data, created=True)
+        else:
+            upds, olds = self._get_updates()
+            if upds:
+                await self.update_one({"_id": self.id}, upds)
+            self._mark_saved(olds, created=False)
 
-            await self.run_triggers(triggers.after_create)
-            await self.run_triggers(
-                triggers.after_save,
-                created=True,  # pyright: ignore
+        await self._after_save(created=created)
+        return self
+
+    @classmethod
+    async def save_many(
+        cls,
+        docs: Sequence[Self],
+        *,
+        ordered: bool = False,
+        batch_size: int = DEFAULT_SAVE_BATCH_SIZE,
+        session: AgnosticClientSession | None = None,
+    ) -> Sequence[Self]:
+        """
+        Save models with `bulk_write`, `batch_size` models per request.
+
+        Inserts and updates are computed as in `save()`, triggers of a batch run
+        concurrently before and after the request. On `BulkWriteError` models
+        which were written are still marked as saved.
+        """
+        for start in range(0, len(docs), batch_size):
+            await cls._save_batch(
+                docs[start : start + batch_size],
+                ordered=ordered,
+                session=session,
             )
+        return docs
 
-            return self
+    @classmethod
+    async def upsert(
+        cls,
+        doc: Self,
+        on: Sequence[str],
+        *,
+        session: AgnosticClientSession | None = None,
+    ) -> Self:
+        """
+        Update document with the same `on` fields or insert the model.
 
-        await self.run_triggers(triggers.before_update)
+        Fields set on the model are written with `$set`, default values only
+        on insert (`$setOnInsert`). The model is refreshed from the stored
+        document, so defaults not sent to a matched document are replaced by
+        its values. Triggers are not run.
+        """
+        filter_, upds = doc._upsert_update(on)  # noqa: SLF001
+        data = await cls._write(
+            cls.collection.find_one_and_update(
+                filter_,
+                upds,
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+                session=session,
+            ),
+        )
+        doc._refresh(data)  # noqa: SLF001
+        return doc
 
-        olds = self._olds
-        data = self._dump()
+    @classmethod
+    async def upsert_many(
+        cls,
+        docs: Sequence[Self],
+        on: Sequence[str],
+        *,
+        ordered: bool = False,
+        batch_size: int = DEFAULT_SAVE_BATCH_SIZE,
+        session: AgnosticClientSession | None = None,
+    ) -> Sequence[Self]:
+        """
+        Upsert models by `on` fields with `bulk_write`, see `upsert`.
 
-        keys = set(data) | set(olds)
-        upds: dict[str, dict[str, Any]] = defaultdict(dict)
+        Ids of upserted documents are taken from the result, matched ones are
+        requested by one more query to refresh the models. Models of matched
+        documents deleted or changed before that query are left as they were.
+        `on` values must be hashable.
+        """
+        for start in range(0, len(docs), batch_size):
+            await cls._upsert_batch(
+                docs[start : start + batch_size],
+                on,
+                ordered=ordered,
+                session=session,
+            )
+        return docs
 
-        for key in keys:
-            new = data.get(key, undefined)
-            old = olds.get(key, undefined)
+    @classmethod
+    async def _upsert_batch(
+        cls,
+        docs: Sequence[Self],
+        on: Sequence[str],
+        *,
+        ordered: bool,
+        session: AgnosticClientSession | None,
+    ) -> None:
+        updates = [doc._upsert_update(on) for doc in docs]  # noqa: SLF001
+        result = await cls.bulk_write(
+            [UpdateOne(filter_, upds, upsert=True) for filter_, upds in updates],
+            ordered=ordered,
+            session=session,
+        )
 
-            if new == old:
-                continue
+        ids: dict[int, Any] = dict(result.upserted_ids or {})
+        matched = [index for index in range(len(docs)) if index not in ids]
+        found: dict[tuple[Any, ...], Mapping[str, Any]] = {}
+        if matched:
+            keys = list(updates[0][0])
+            found = {
+                tuple(item.get(key) for key in keys): item
+                async for item in cls.collection.find(
+                    {"$or": [updates[index][0] for index in matched]},
+                    session=session,  # type: ignore[arg-type]
+                )
+            }
 
-            if new is undefined:
-                upds["$unset"][key] = ""
+        for index, (doc, (filter_, upds)) in enumerate(zip(docs, updates, strict=True)):
+            if index in ids:
+                olds = {
+                    **filter_,
+                    **upds.get("$setOnInsert", {}),
+                    **upds.get("$set", {}),
+                    "_id": ids[index],
+                }
+                doc._mark_saved(olds, created=True)  # noqa: SLF001
+                continue
 
+            # filter values as read back: datetimes in ms, tz by codec options
+            codec_options = cls._codec_options
+            stored = decode(encode(filter_, codec_options=codec_options), codec_options)
+            data = found.get(tuple(stored.values()))
+            if data is None:
+                # written, but the document was deleted or changed meanwhile
+                logger.warning("%s: upserted document not found by %s", cls, filter_)
             else:
-                upds["$set"][key] = new
+                doc._refresh(data)  # noqa: SLF001
+
+    def _upsert_update(
+        self,
+        on: Sequence[str],
+    ) -> tuple[dict[str, Any], dict[str, dict[str, Any]]]:
+        """Get filter by `on` fields and update operators of upsert."""
+        if not on:
+            raise ModelUpsertKeyError(on)
+
+        data = self._dump()
+        filter_: dict[str, Any] = {}
+        for name in on:
+            field = self.__fields__.get(name)
+            if field is None or field.alias not in data:
+                raise ModelUpsertKeyError(name)
+            filter_[field.alias] = data.pop(field.alias)
+
+        assigned = {
+            self.__fields__[name].alias for name in self.__fields_set__ | self._dirty
+        }
+        values = {key: value for key, value in data.items() if key in assigned}
+        defaults = {key: value for key, value in data.items() if key not in assigned}
+        if "_id" in values:
+            defaults["_id"] = values.pop("_id")
+
+        upds = {"$set": values, "$setOnInsert": defaults or filter_}
+        return filter_, {op: value for op, value in upds.items() if value}
+
+    @classproperty
+    @classmethod
+    def _coalescer(cls) -> WriteCoalescer | None:
+        """
+        Write coalescer of `save()` if `__meta__.coalesce_writes` is enabled.
+
+        Concurrent saves are merged into `bulk_write` requests of up to
+        `coalesce_max_batch` models sent after `coalesce_delay` seconds.
+        """
+        meta = cls.__meta__
+        if not meta.coalesce_writes:
+            return None
+
+        return cls._cached_handle(
+            "coalescer",
+            (
+                asyncio.get_running_loop(),
+                meta.client,
+                meta.database_name,
+                meta.collection_name,
+                meta.coalesce_max_batch,
+                meta.coalesce_delay,
+            ),
+            lambda: WriteCoalescer(
+                partial(cls.bulk_write, ordered=False),
+                meta.coalesce_max_batch,
+                meta.coalesce_delay,
+            ),
+        )
 
-        if upds:
-            await self.update_one({"_id": self.id}, upds)
+    @classmethod
+    async def flush_writes(cls) -> None:
+        """Send writes queued by `save()` and wait for them."""
+        coalescer = cls._coalescer
+        if coalescer is not None:
+            await coalescer.flush()
+
+    @classmethod
+    async def _save_batch(
+        cls,
+        docs: Sequence[Self],
+        *,
+        ordered: bool,
+        session: AgnosticClientSession | None,
+    ) -> None:
+        await cls.run_batch_triggers(triggers.before_save_many, list(docs))
+        created = await asyncio.gather(
+            *(doc._before_save() for doc in docs),  # noqa: SLF001
+        )
+
+        requests: list[InsertOne[_DocumentType] | UpdateOne] = []
+        # index of the model request (`None` if unchanged) and new `_olds`
+        saves: list[tuple[int | None, dict[str, Any]]] = []
+        for doc, create in zip(docs, created, strict=True):
+            request, olds = doc._save_request(created=create)  # noqa: SLF001
+            saves.append((None if request is None else len(requests), olds))
+            if request is not None:
+                requests.append(request)
+
+        failed = set(range(len(requests)))
+        try:
+            if requests:
+                await cls.bulk_write(requests, ordered=ordered, session=session)
+            failed.clear()
+        except BulkWriteError as exc:
+            failed = {error["index"] for error in exc.details["writeErrors"]}
+            if ordered:
+                failed = set(range(min(failed, default=0), len(requests)))
+            raise
+        finally:
+            # models written before an error are saved as well
+            for doc, create, (index, olds) in zip(docs, created, saves, strict=True):
+                if index not in failed:
+                    doc._mark_saved(olds, created=create)  # noqa: SLF001
+
+        await asyncio.gather(
+            *(
+                doc._after_save(created=create)  # noqa: SLF001
+                for doc, create in zip(docs, created, strict=True)
+            ),
+        )
+        await cls.run_batch_triggers(triggers.after_save_many, list(docs))
+
+    def _save_request(
+        self,
+        *,
+        created: bool,
+    ) -> tuple[InsertOne[_DocumentType] | UpdateOne | None, dict[str, Any]]:
+        """Get write request of `save()` (`None` if unchanged) and new `_olds`."""
+        if created:
+            data = self._dump()
+            return InsertOne(data), data
+
+        upds, olds = self._get_updates()
+        return (UpdateOne({"_id": self.id}, upds) if upds else None), olds
+
+    async def _before_save(self) -> bool:
+        """Run triggers before save, returns `True` if model will be created."""
+        if not type(self).__meta__.triggers:
+            return not self.is_created
+
+        await self.run_triggers(triggers.before_save)
+
+        if not self.is_created:
+            await self.run_triggers(triggers.before_create)
+            return True
+
+        await self.run_triggers(triggers.before_update)
+        return False
 
-        self._olds = data
+    async def _after_save(self, *, created: bool) -> None:
+        if not type(self).__meta__.triggers:
+            return
+
+        if created:
+            await self.run_triggers(triggers.after_create)
+        else:
+            await self.run_triggers(triggers.after_update)
 
-        await self.run_triggers(triggers.after_update)
         await self.run_triggers(
             triggers.after_save,
-            created=False,  # pyright: ignore
+            created=created,  # pyright: ignore
         )
 
-        return self
+    def _mark_saved(self, olds: Mapping[str, Any], *, created: bool) -> None:
+        """Mark model as saved, `olds` of created model contain new `_id`."""
+        if created:
+            self.id = olds["_id"]
+        self._reset_changes(olds)
+        self._put_identity()
+
+    def _refresh(self, data: Mapping[str, Any]) -> None:
+        """Replace field values with the stored document and mark model as saved."""
+        stored = self._load(data)
+        self.__dict__.update(stored.__dict__)
+        self.__fields_set__.update(stored.__fields_set__)
+        self._mark_saved(stored._olds, created=False)  # noqa: SLF001
 
     async def delete(self) -> Self:
         """Delete model."""
@@ -129,80 +454,460 @@ class MotorModel(_MotorModelType[_IdType], Generic[_IdType]):
 
         await self.run_triggers(triggers.before_delete)
         await self.delete_one({"_id": self.id})
+
+        imap = IdentityMap.current()
+        if imap is not None:
+            imap.discard(self)
+
         await self.run_triggers(triggers.after_delete)
         return self
 
+    def _put_identity(self) -> None:
+        imap = IdentityMap.current()
+        if imap is not None and self._loaded is None:
+            imap.put(self)
+
     @classmethod
-    async def find_one(cls, *args: Any, **kwargs: Any) -> Self | None:
-        """Find one document."""
+    async def find_one(
+        cls,
+        *args: Any,
+        trusted: bool | None = None,
+        raw: bool | None = None,
+        fields: Collection[str] | None = None,
+        **kwargs: Any,
+    ) -> Self | None:
+        """
+        Find one document.
+
+        With `fields` only these fields are loaded, see `find`.
+        Inside `IdentityMap` `{"_id": ...}` lookups of loaded documents return
+        the loaded instance without a query.
+        """
+        imap = IdentityMap.current()
+        if imap is not None and fields is None and len(args) == 1 and not kwargs:
+            id_ = filter_id(args[0])
+            if id_ is not None:
+                doc = imap.get(cls, id_)
+                if doc is not None:
+                    return doc
+
+        cls._advise("find_one", args, kwargs)
+        names = None
+        if fields is not None:
+            names, kwargs["projection"] = cls._projection(fields)
+
         kwargs["limit"] = 1
-        item = await cls.collection.find_one(*args, **kwargs)
-        return cls._load(item) if item is not None else None
+        query = cls._cached_query("find_one", args, kwargs)
+        if query is None:
+            item = await cls._read_collection(raw).find_one(*args, **kwargs)
+        else:
+            item = await query.load(
+                lambda: cls._raw_collection.find_one(*args, **kwargs),
+            )
+        if item is None:
+            return None
+
+        doc = cls._load(item, trusted, names)
+        if imap is not None and names is None:
+            return imap.add(doc)
+        return doc
 
     @classmethod
     def find(
         cls,
         filter: dict[str, Any],  # noqa: A002
         *args: Any,
+        trusted: bool | None = None,
+        raw: bool | None = None,
+        fields: Collection[str] | None = None,
+        executor: Executor | None = None,
         **kwargs: Any,
     ) -> MotorCursor[Self]:
-        """Fine many documents."""
+        """
+        Fine many documents.
+
+        With `fields` only these fields (and `id`) are requested and loaded,
+        the others are `undefined` and `save()` does not touch them.
+        With `executor` documents are decoded in it in batches of `batch_size`
+        (see `MotorCursor`), process pools are fed with raw BSON.
+        """
         # filter.setdefault('_cls', cls.__name__)
-        return MotorCursor(cls, cls.collection.find(filter, *args, **kwargs))
+        if isinstance(executor, ProcessPoolExecutor):
+            raw = True
+
+        cls._advise("find", (filter,), kwargs)
+        names = None
+        if fields is not None:
+            names, kwargs["projection"] = cls._projection(fields)
+
+        query = cls._cached_query("find", (filter, *args), kwargs)
+        if query is not None:
+            raw = True
+
+        return MotorCursor(
+            cls,
+            cls._read_collection(raw).find(filter, *args, **kwargs),
+            trusted=trusted,
+            fields=names,
+            executor=executor,
+            batch_size=kwargs.get("batch_size") or DEFAULT_BATCH_SIZE,
+            cache=query,
+        )
+
+    @classmethod
+    async def resolve_references(
+        cls,
+        docs: Sequence[Self],
+        *fields: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Sequence[Self]:
+        """
+        Resolve references in `fields` of `docs` with `$in` queries.
+
+        See `overlead.odm.motor.references.resolve_references`.
+        """
+        return await resolve_references(docs, *fields, chunk_size=chunk_size)
+
+    @classmethod
+    async def lookup(
+        cls,
+        filter: dict[str, Any],  # noqa: A002
+        *fields: str,
+        pipeline: Sequence[dict[str, Any]] = (),
+        trusted: bool | None = None,
+        **kwargs: Any,
+    ) -> list[Self]:
+        """
+        Find documents with references in `fields` joined by the server.
+
+        `pipeline` stages (e.g. `$sort`, `$limit`) run after `$match` and before
+        the joins, see `Lookup`.
+        """
+        lookup = Lookup(cls, *fields)
+        cursor = cls.aggregate(
+            [{"$match": filter}, *pipeline, *lookup.pipeline],
+            **kwargs,
+        )
+        return [lookup.load(item, trusted) async for item in cursor]
+
+    @classmethod
+    def _read_collection(cls, raw: bool | None = None) -> AsyncIOMotorCollection:
+        """
+        Get collection for reads.
+
+        In raw mode (`raw` or `__meta__.raw_load`) documents are read as
+        `RawBSONDocument` and models keep only their bytes, see `_load`.
+        """
+        if raw is None:
+            raw = cls.__meta__.raw_load
+        return cls._raw_collection if raw else cls.collection
 
     @classmethod
     def insert_one(cls, *args: Any, **kwargs: Any) -> Awaitable[InsertOneResult]:
         """Insert one document."""
-        return cls.collection.insert_one(*args, **kwargs)
+        return cls._write(cls.collection.insert_one(*args, **kwargs))
 
     @classmethod
     def update_one(cls, *args: Any, **kwargs: Any) -> Awaitable[UpdateResult]:
         """Update one document."""
-        return cls.collection.update_one(*args, **kwargs)
+        cls._advise("update_one", args, kwargs)
+        return cls._write(cls.collection.update_one(*args, **kwargs))
 
     @classmethod
     def delete_one(cls, *args: Any, **kwargs: Any) -> Awaitable[DeleteResult]:
         """Delete one document."""
-        return cls.collection.delete_one(*args, **kwargs)
+        cls._advise("delete_one", args, kwargs)
+        return cls._write(cls.collection.delete_one(*args, **kwargs))
 
     @classmethod
-    def insert_many(
+    async def insert_many(
         cls,
         documents: list[Any],
         ordered: bool = True,
         bypass_document_validation: bool = False,
         session: AgnosticClientSession | None = None,
-    ) -> Awaitable[InsertManyResult]:
+    ) -> InsertManyResult:
         """Insert many documents."""
-        documents = [
-            doc._dump() if isinstance(doc, MotorModel) else doc  # noqa: SLF001
-            for doc in documents
-        ]
+        await cls.run_batch_triggers(triggers.before_insert_many, documents)
 
-        return cls.collection.insert_many(
-            documents=documents,
-            ordered=ordered,
-            bypass_document_validation=bypass_document_validation,
-            session=session,
+        result = await cls._write(
+            cls.collection.insert_many(
+                documents=[
+                    doc._dump() if isinstance(doc, MotorModel) else doc  # noqa: SLF001
+                    for doc in documents
+                ],
+                ordered=ordered,
+                bypass_document_validation=bypass_document_validation,
+                session=session,
+            ),
+        )
+
+        await cls.run_batch_triggers(triggers.after_insert_many, documents, result)
+        return result
+
+    @classmethod
+    async def insert_stream(
+        cls,
+        documents: Iterable[Any] | AsyncIterable[Any],
+        *,
+        batch_size: int = DEFAULT_SAVE_BATCH_SIZE,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        ordered: bool = True,
+        session: AgnosticClientSession | None = None,
+    ) -> AsyncIterator[InsertBatch]:
+        """
+        Insert models or documents from a sync or async iterable.
+
+        Documents are dumped in batches of `batch_size` while up to
+        `max_in_flight` `insert_many` requests are running. Results are
+        yielded per batch in order, only batches in flight and the next one
+        are kept in memory.
+        `ordered` inserts run one batch at a time, so the first error stops
+        the stream before later batches are sent. Inserted models are marked
+        as saved, triggers are not run.
+        """
+        in_flight: deque[asyncio.Task[InsertBatch]] = deque()
+        limit = 1 if ordered else max_in_flight
+        start = 0
+
+        try:
+            async for batch in abatched(documents, batch_size):
+                # dump the next batch while the previous ones are written
+                data = [
+                    doc._dump() if isinstance(doc, MotorModel) else doc  # noqa: SLF001
+                    for doc in batch
+                ]
+                if len(in_flight) >= limit:
+                    yield await in_flight.popleft()
+
+                in_flight.append(
+                    asyncio.create_task(
+                        cls._insert_batch(start, batch, data, ordered, session),
+                    ),
+                )
+                start += len(batch)
+
+            while in_flight:
+                yield await in_flight.popleft()
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    @classmethod
+    async def _insert_batch(  # noqa: PLR0913
+        cls,
+        start: int,
+        batch: list[Any],
+        data: list[dict[str, Any]],
+        ordered: bool,
+        session: AgnosticClientSession | None,
+    ) -> InsertBatch:
+        result = await cls._write(
+            cls.collection.insert_many(data, ordered=ordered, session=session),
         )
+        for doc, values in zip(batch, data, strict=True):
+            if isinstance(doc, MotorModel):
+                doc._mark_saved(values, created=True)  # noqa: SLF001
+        return InsertBatch(start, len(batch), result)
 
     @classmethod
-    def update_many(cls, *args: Any, **kwargs: Any) -> Awaitable[UpdateResult]:
+    async def update_many(
+        cls,
+        filter: dict[str, Any],  # noqa: A002
+        update: Any,
+        *args: Any,
+        **kwargs: Any,
+    ) -> UpdateResult:
         """Update many documents."""
-        return cls.collection.update_many(*args, **kwargs)
+        cls._advise("update_many", (filter,), kwargs)
+        await cls.run_batch_triggers(triggers.before_update_many, filter, update)
+        result = await cls._write(
+            cls.collection.update_many(filter, update, *args, **kwargs),
+        )
+        await cls.run_batch_triggers(
+            triggers.after_update_many,
+            filter,
+            update,
+            result,
+        )
+        return result
 
     @classmethod
-    def delete_many(cls, *args: Any, **kwargs: Any) -> Awaitable[DeleteResult]:
+    async def delete_many(
+        cls,
+        filter: dict[str, Any],  # noqa: A002
+        *args: Any,
+        **kwargs: Any,
+    ) -> DeleteResult:
         """Delete many documents."""
-        return cls.collection.delete_many(*args, **kwargs)
+        cls._advise("delete_many", (filter,), kwargs)
+        await cls.run_batch_triggers(triggers.before_delete_many, filter)
+        result = await cls._write(
+            cls.collection.delete_many(filter, *args, **kwargs),
+        )
+        await cls.run_batch_triggers(triggers.after_delete_many, filter, result)
+        return result
 
     @classmethod
     def count_documents(cls, *args: Any, **kwargs: Any) -> Awaitable[int]:
         """Count documents."""
-        return cls.collection.count_documents(*args, **kwargs)
+        cls._advise("count_documents", args, kwargs)
+        query = cls._cached_query("count_documents", args, kwargs)
+        if query is None:
+            return cls.collection.count_documents(*args, **kwargs)
+        return query.load(lambda: cls.collection.count_documents(*args, **kwargs))
+
+    @classmethod
+    async def paginate(
+        cls,
+        filter: Mapping[str, Any] | None = None,  # noqa: A002
+        *,
+        sort: Any = None,
+        after: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        check_index: bool = True,
+        **kwargs: Any,
+    ) -> Page[Self]:
+        """
+        Get page of models after the `after` continuation token.
+
+        `_id` is added to `sort` as a tie-breaker, so with `check_index` the
+        declared index must end with it too, e.g. `["status", "-created",
+        "-_id"]` for `sort=["status", "-created"]`. See
+        `overlead.odm.motor.pagination.paginate`.
+        """
+        return await paginate(
+            cls,
+            filter,
+            sort,
+            after=after,
+            limit=limit,
+            check_index=check_index,
+            **kwargs,
+        )
+
+    @classmethod
+    def parallel_scan(
+        cls,
+        filter: Mapping[str, Any] | None = None,  # noqa: A002
+        partitions: int = DEFAULT_PARTITIONS,
+        *,
+        by_time: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        queue_size: int = DEFAULT_SCAN_QUEUE_SIZE,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Self, None]:
+        """
+        Yield models read by concurrent cursors over `_id` ranges, unordered.
+
+        See `overlead.odm.motor.scan.parallel_scan`.
+        """
+        return parallel_scan(
+            cls,
+            filter,
+            partitions,
+            by_time=by_time,
+            batch_size=batch_size,
+            queue_size=queue_size,
+            **kwargs,
+        )
+
+    @classmethod
+    async def scan_partitions(
+        cls,
+        worker: Callable[[MotorCursor[Self]], Awaitable[_R]],
+        filter: Mapping[str, Any] | None = None,  # noqa: A002
+        partitions: int = DEFAULT_PARTITIONS,
+        *,
+        by_time: bool = False,
+        **kwargs: Any,
+    ) -> list[_R]:
+        """
+        Run `worker` for cursors of `_id` ranges concurrently.
+
+        See `overlead.odm.motor.scan.scan_partitions`.
+        """
+        return await scan_partitions(
+            cls,
+            worker,
+            filter,
+            partitions,
+            by_time=by_time,
+            **kwargs,
+        )
 
     @classmethod
-    def bulk_write(
+    def watch(
+        cls,
+        pipeline: Sequence[Mapping[str, Any]] = (),
+        *,
+        full_document: str | None = None,
+        resume_after: Mapping[str, Any] | None = None,
+        token_store: ResumeTokenStore | None = None,
+        token_key: str | None = None,
+        batch_size: int = DEFAULT_EVENTS_BATCH_SIZE,
+        queue_size: int = DEFAULT_EVENTS_QUEUE_SIZE,
+        trusted: bool | None = None,
+    ) -> AsyncGenerator[ChangeEvent[Self], None]:
+        """
+        Iterate over changes of collection as `ChangeEvent` of the model.
+
+        See `overlead.odm.motor.changes.watch_changes`.
+        """
+        return watch_changes(
+            cls,
+            pipeline,
+            full_document=full_document,
+            resume_after=resume_after,
+            token_store=token_store,
+            token_key=token_key,
+            batch_size=batch_size,
+            queue_size=queue_size,
+            trusted=trusted,
+        )
+
+    @classmethod
+    def _cached_query(
+        cls,
+        operation: str,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> CachedQuery | None:
+        """Query of `__meta__.query_cache` if enabled and query is cacheable."""
+        cache = cls.__meta__.query_cache
+        if cache is None:
+            return None
+        return cache.query(
+            cls.collection.full_name,
+            operation,
+            args,
+            kwargs,
+            cls._codec_options,
+        )
+
+    @classmethod
+    def _write(cls, write: Awaitable[_R]) -> Awaitable[_R]:
+        """Invalidate `__meta__.query_cache` of collection after write."""
+        cache = cls.__meta__.query_cache
+        if cache is None:
+            return write
+        return cache.invalidating(cls.collection.full_name, write)
+
+    @classmethod
+    def _advise(
+        cls,
+        operation: str,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> None:
+        """Record query in `QueryAdvisor` of the current context if any."""
+        advisor = QueryAdvisor.current()
+        if advisor is not None:
+            filter_ = args[0] if args else kwargs.get("filter")
+            advisor.record(cls, operation, filter_, kwargs.get("sort"))
+
+    @classmethod
+    async def bulk_write(
         cls,
         requests: Sequence[
             InsertOne[_DocumentType]
@@ -216,14 +921,19 @@ class MotorModel(_MotorModelType[_IdType], Generic[_IdType]):
         ordered: bool = True,
         bypass_document_validation: bool = False,
         session: AgnosticClientSession | None = None,
-    ) -> Awaitable[BulkWriteResult]:
+    ) -> BulkWriteResult:
         """Bluk write."""
-        return cls.collection.bulk_write(
-            requests,
-            ordered=ordered,
-            bypass_document_validation=bypass_document_validation,
-            session=session,
+        await cls.run_batch_triggers(triggers.before_bulk_write, requests)
+        result = await cls._write(
+            cls.collection.bulk_write(
+                requests,
+                ordered=ordered,
+                bypass_document_validation=bypass_document_validation,
+                session=session,
+            ),
         )
+        await cls.run_batch_triggers(triggers.after_bulk_write, requests, result)
+        return result
 
     @classmethod
     def aggregate(cls, pipeline: list[dict[str, Any]], **kwargs: Any) -> Any:
@@ -234,29 +944,105 @@ class MotorModel(_MotorModelType[_IdType], Generic[_IdType]):
     async def ensure_indexes(
         cls,
         session: AsyncIOMotorClientSession | None = None,
-    ) -> None:
+    ) -> IndexReport:
         """Ensure all indexes in collections created."""
         logger.info("%s: Ensure indexes", cls)
-        indexes = cls.__meta__.indexes
-        for index in indexes:
-            index_vals = index.dict()
-            keys, opts = index_vals["keys"], index_vals["opts"]
-            keys = list(keys.items())
+        return await ensure_collection_indexes(
+            cls.collection,
+            cls.__meta__.indexes,
+            session,
+        )
 
-            # if cls.__meta__.cls_constraint:
-            #     opts['partialFilterExpression'] = {
-            #         **cls.__meta__.partial_filter_expression,
-            #         **opts.get('partialFilterExpression', {}),
-            #     }
+    @classmethod
+    async def plan_indexes(
+        cls,
+        session: AsyncIOMotorClientSession | None = None,
+    ) -> IndexPlan:
+        """
+        Diff `Meta.indexes` with the indexes of collection.
 
-            await cls.collection.create_index(keys, **opts, session=session)
+        Indexes of all models sharing the collection are merged, as in
+        `ensure_all_indexes`, so they are not planned as drops.
+        """
+        meta = cls.__meta__
+        namespace = (meta.client, meta.database_name, meta.collection_name)
+        return await plan_collection_indexes(
+            cls.collection,
+            [
+                index
+                for model in cls.__registry__
+                if issubclass(model, MotorModel)
+                and (
+                    model.__meta__.client,
+                    model.__meta__.database_name,
+                    model.__meta__.collection_name,
+                )
+                == namespace
+                for index in model.__meta__.indexes
+            ],
+            session,
+        )
 
     @classmethod
-    async def ensure_all_indexes(cls) -> None:
-        """Ensure all indexes in all collections created."""
-        for collection in cls.__registry__:
-            if issubclass(collection, cls):
-                await collection.ensure_indexes()
+    async def apply_indexes(
+        cls,
+        plan: IndexPlan | None = None,
+        *,
+        drop: bool = False,
+        hidden_staging: bool = True,
+        session: AsyncIOMotorClientSession | None = None,
+    ) -> IndexPlan:
+        """Apply `plan` (`plan_indexes()` by default) as rolling index builds."""
+        if plan is None:
+            plan = await cls.plan_indexes(session)
+
+        logger.info("%s: Apply indexes plan %s", cls, plan)
+        await apply_index_plan(
+            cls.collection,
+            plan,
+            drop=drop,
+            hidden_staging=hidden_staging,
+            session=session,
+        )
+        return plan
+
+    @classmethod
+    async def ensure_all_indexes(
+        cls,
+        *,
+        concurrency: int = DEFAULT_INDEX_CONCURRENCY,
+    ) -> list[IndexReport]:
+        """
+        Ensure all indexes in all collections created.
+
+        Indexes of models sharing a collection are merged, up to `concurrency`
+        collections are processed at once.
+        """
+        collections: dict[tuple[int, str], tuple[AsyncIOMotorCollection, list[Index]]]
+        collections = {}
+        for model in cls.__registry__:
+            if issubclass(model, cls):
+                collection = model.collection
+                key = (id(collection.database.client), collection.full_name)
+                collections.setdefault(key, (collection, []))[1].extend(
+                    model.__meta__.indexes,
+                )
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def ensure(
+            collection: AsyncIOMotorCollection,
+            indexes: list[Index],
+        ) -> IndexReport:
+            async with semaphore:
+                logger.info("%s: Ensure indexes", collection.full_name)
+                return await ensure_collection_indexes(collection, indexes)
+
+        return list(
+            await asyncio.gather(
+                *(ensure(*value) for value in collections.values()),
+            ),
+        )
 
     async def run_triggers(
         self,
@@ -264,11 +1050,42 @@ class MotorModel(_MotorModelType[_IdType], Generic[_IdType]):
         *args: _P.args,
         **kwargs: _P.kwargs,
     ) -> None:
-        """Execute triggers."""
-        for trig in self._get_triggers(type_):
-            for value in trig._exec(self, *args, **kwargs):  # noqa: SLF001
-                while asyncio.iscoroutine(value):
-                    value = await value  # noqa: PLW2901
+        """Execute triggers, `independent` ones concurrently after the others."""
+        await _run_triggers(
+            self._get_triggers(type_),
+            self._trigger_runner,
+            self,
+            *args,
+            **kwargs,
+        )
+
+    @classmethod
+    async def run_batch_triggers(
+        cls,
+        type_: type[batch_trigger[Self, _P, Any]],
+        *args: _P.args,
+        **kwargs: _P.kwargs,
+    ) -> None:
+        """Execute triggers of bulk operations, callbacks get the model class."""
+        await _run_triggers(
+            cls._get_triggers(type_),
+            cls._trigger_runner,
+            cls,
+            *args,
+            **kwargs,
+        )
+
+    @classproperty
+    @classmethod
+    def _trigger_runner(cls) -> BackgroundRunner:
+        """Runner of `background` triggers, `default_runner` if not in `Meta`."""
+        runner = cls.__meta__.trigger_runner
+        return default_runner if runner is None else runner
+
+    @classmethod
+    async def drain_triggers(cls) -> None:
+        """Wait for queued `background` triggers of the model runner."""
+        await cls._trigger_runner.drain()
 
     @classproperty
     @classmethod
@@ -306,6 +1123,40 @@ class MotorModel(_MotorModelType[_IdType], Generic[_IdType]):
         return id
 
 
+async def _run_triggers(
+    trigs: tuple[trigger[Any, _P, Any], ...],
+    runner: BackgroundRunner,
+    instance: Any,
+    *args: _P.args,
+    **kwargs: _P.kwargs,
+) -> None:
+    if not trigs:
+        return
+
+    independent = []
+    for trig in trigs:
+        if trig.background:
+            runner.submit(_run_trigger(trig, instance, *args, **kwargs))
+        elif trig.independent:
+            independent.append(_run_trigger(trig, instance, *args, **kwargs))
+        else:
+            await _run_trigger(trig, instance, *args, **kwargs)
+
+    if independent:
+        await asyncio.gather(*independent)
+
+
+async def _run_trigger(
+    trig: trigger[Any, _P, Any],
+    instance: Any,
+    *args: _P.args,
+    **kwargs: _P.kwargs,
+) -> None:
+    for value in trig._exec(instance, *args, **kwargs):  # noqa: SLF001
+        while asyncio.iscoroutine(value):
+            value = await value  # noqa: PLW2901
+
+
 _ObjectIdModelType: TypeAlias = MotorModel[ObjectId]
 
 
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from typing import TYPE_CHECKING, Any, Generic, NamedTuple, TypeVar
+
+import bson
+from bson.errors import BSONError
+
+from overlead.odm.errors import ModelPageTokenError, ModelSortIndexError
+
+from .advisor import filter_shape, index_keys, is_covered, sort_shape
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Mapping
+
+    from overlead.odm.motor.model import MotorModel
+
+__all__ = ["DEFAULT_PAGE_SIZE", "Page", "keyset_filter", "paginate"]
+
+T = TypeVar("T", bound="MotorModel")  # type: ignore[type-arg]
+
+DEFAULT_PAGE_SIZE = 50
+
+_Sort = list[tuple[str, int]]
+
+
+class Page(NamedTuple, Generic[T]):
+    """Page of models and the token of the next page, `None` on the last one."""
+
+    items: list[T]
+    next: str | None
+
+
+async def paginate(  # noqa: PLR0913
+    model: type[T],
+    filter: Mapping[str, Any] | None,  # noqa: A002
+    sort: Any,
+    after: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    check_index: bool = True,
+    **kwargs: Any,
+) -> Page[T]:
+    """
+    Get page of models after the `after` token by keyset (seek) pagination.
+
+    `_id` is added to `sort` as a tie-breaker, the next page continues from
+    the sort values of the last model with a range filter, so every page
+    costs the same. With `check_index` the filter and sort must be supported
+    by a declared index (see `QueryAdvisor`), including the added `_id`:
+    for `sort=["status", "-created"]` declare `["status", "-created", "-_id"]`,
+    an index without it can't serve the sort and MongoDB sorts in memory.
+    Sort fields must not be missing or `null` in documents.
+    """
+    keys = _sort(sort)
+    if check_index and not is_covered(
+        index_keys(model),
+        filter_shape(filter or {}),
+        tuple(keys),
+    ):
+        raise ModelSortIndexError(keys)
+
+    query = dict(filter or {})
+    if after is not None:
+        predicate = keyset_filter(keys, _decode(model, after, keys))
+        query = {"$and": [query, predicate]} if query else predicate
+
+    docs = await model.find(query, sort=keys, limit=limit + 1, **kwargs).to_list(None)
+    if len(docs) <= limit:
+        return Page(docs, None)
+
+    docs = docs[:limit]
+    return Page(docs, _encode(model, keys, _values(docs[-1], keys)))
+
+
+def keyset_filter(sort: _Sort, values: list[Any]) -> dict[str, Any]:
+    """Filter of documents after `values` of `sort` keys in sort order."""
+    branches = []
+    for index, (key, direction) in enumerate(sort):
+        branch = {
+            prev: value
+            for (prev, _), value in zip(sort[:index], values[:index], strict=True)
+        }
+        branch[key] = {"$gt" if direction == 1 else "$lt": values[index]}
+        branches.append(branch)
+    return branches[0] if len(branches) == 1 else {"$or": branches}
+
+
+def _sort(sort: Any) -> _Sort:
+    keys = [(key, int(direction)) for key, direction in sort_shape(sort)]
+    if not keys:
+        return [("_id", 1)]
+    if all(key != "_id" for key, _ in keys):
+        keys.append(("_id", keys[-1][1]))
+    return keys
+
+
+def _values(doc: MotorModel[Any], sort: _Sort) -> list[Any]:
+    stored = doc._get_olds()  # noqa: SLF001
+    values = []
+    for key, _ in sort:
+        value: Any = stored
+        for part in key.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        values.append(value)
+    return values
+
+
+def _encode(model: type[T], sort: _Sort, values: list[Any]) -> str:
+    data = bson.encode(
+        {"s": [list(item) for item in sort], "v": values},
+        codec_options=model._codec_options,  # noqa: SLF001
+    )
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def _decode(model: type[T], token: str, sort: _Sort) -> list[Any]:
+    try:
+        data = bson.decode(
+            base64.urlsafe_b64decode(token),
+            codec_options=model._codec_options,  # noqa: SLF001
+        )
+    except (BSONError, binascii.Error, ValueError) as exc:
+        raise ModelPageTokenError(token) from exc
+
+    if [tuple(item) for item in data.get("s", ())] != sort:
+        raise ModelPageTokenError(token)
+    values: list[Any] = data["v"]
+    return values
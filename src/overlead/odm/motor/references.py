@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Mapping
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from pydantic import BaseModel
+
+from overlead.odm.errors import ModelFieldError
+from overlead.odm.fields import Reference
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Awaitable, Sequence
+
+    from overlead.odm.motor.model import MotorModel
+
+__all__ = ["DEFAULT_CHUNK_SIZE", "collect_references", "resolve_references"]
+
+T = TypeVar("T", bound=BaseModel)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+_Found = list[tuple[Reference[Any], tuple[str, ...]]]
+
+
+async def resolve_references(
+    docs: Sequence[T],
+    *fields: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Sequence[T]:
+    """
+    Load documents of references in `fields` of `docs` and attach them.
+
+    Fields are paths with dots, through nested models, lists, dicts and already
+    resolved references (`"author.company"`). Every level costs one `$in` query
+    per referenced model (per `chunk_size` ids), the queries are concurrent.
+    Loaded documents are available as `Reference.document` and `load()`.
+    """
+    targets: list[tuple[Iterable[Any], tuple[str, ...]]] = [
+        (docs, tuple(field.split("."))) for field in fields
+    ]
+
+    while targets:
+        found: _Found = []
+        for values, path in targets:
+            found.extend(collect_references(values, path))
+
+        await _load([ref for ref, _ in found], chunk_size)
+
+        nested: defaultdict[tuple[str, ...], list[Any]] = defaultdict(list)
+        for ref, path in found:
+            if path and ref.document is not None:
+                nested[path].append(ref.document)
+        targets = [(values, path) for path, values in nested.items()]
+
+    return docs
+
+
+def collect_references(
+    value: Any,
+    path: tuple[str, ...],
+) -> Iterator[tuple[Any, ...]]:
+    """Find references on `path` with the rest of the path after each one."""
+    if isinstance(value, Reference):
+        yield value, path
+    elif isinstance(value, list | tuple | set):
+        for item in value:
+            yield from collect_references(item, path)
+    elif isinstance(value, Mapping):
+        if path:
+            yield from collect_references(value.get(path[0]), path[1:])
+        else:
+            for item in value.values():
+                yield from collect_references(item, path)
+    elif isinstance(value, BaseModel) and path:
+        if path[0] not in value.__fields__:
+            raise ModelFieldError(path[0])
+        yield from collect_references(getattr(value, path[0]), path[1:])
+
+
+async def _load(refs: list[Reference[Any]], chunk_size: int) -> None:
+    ids: defaultdict[type[MotorModel[Any]], dict[Any, None]] = defaultdict(dict)
+    for ref in refs:
+        if ref.document is None:
+            ids[ref.type_].setdefault(ref)
+
+    queries: list[Awaitable[list[MotorModel[Any]]]] = []
+    for model, values in ids.items():
+        keys = list(values)
+        queries.extend(
+            model.find({"_id": {"$in": keys[i : i + chunk_size]}}).to_list(None)
+            for i in range(0, len(keys), chunk_size)
+        )
+
+    loaded = {
+        (type(doc), doc.id): doc
+        for docs in await asyncio.gather(*queries)
+        for doc in docs
+    }
+    for ref in refs:
+        if ref.document is None:
+            ref.document = loaded.get((ref.type_, ref))
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
+
+from bson import ObjectId
+
+from overlead.odm.errors import ModelPartitionError
+
+from .cursor import DEFAULT_BATCH_SIZE
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import AsyncGenerator, Awaitable, Callable, Mapping
+
+    from overlead.odm.motor.cursor import MotorCursor
+    from overlead.odm.motor.model import MotorModel
+
+__all__ = [
+    "DEFAULT_PARTITIONS",
+    "DEFAULT_SCAN_QUEUE_SIZE",
+    "SAMPLES_PER_PARTITION",
+    "Partition",
+    "parallel_scan",
+    "scan_partitions",
+    "split",
+]
+
+T = TypeVar("T", bound="MotorModel")  # type: ignore[type-arg]
+R = TypeVar("R")
+
+DEFAULT_PARTITIONS = 8
+DEFAULT_SCAN_QUEUE_SIZE = 16
+SAMPLES_PER_PARTITION = 20
+
+
+class Partition(NamedTuple):
+    """Range of `_id` from `lower` (inclusive) to `upper`, `None` is unbounded."""
+
+    lower: Any
+    upper: Any
+
+    def predicate(self) -> dict[str, Any]:
+        """Filter of documents in range."""
+        bounds = {}
+        if self.lower is not None:
+            bounds["$gte"] = self.lower
+        if self.upper is not None:
+            bounds["$lt"] = self.upper
+        return {"_id": bounds} if bounds else {}
+
+
+async def split(
+    model: type[T],
+    filter: Mapping[str, Any] | None = None,  # noqa: A002
+    partitions: int = DEFAULT_PARTITIONS,
+    *,
+    by_time: bool = False,
+) -> list[Partition]:
+    """
+    Split documents matching `filter` into up to `partitions` `_id` ranges.
+
+    Split points are quantiles of a `$sample` of `_id`, so ranges hold about
+    the same number of documents. With `by_time` the time between the first
+    and the last `ObjectId` is split evenly without sampling.
+    """
+    filter = filter or {}  # noqa: A001
+    if partitions < 2:  # noqa: PLR2004
+        points = []
+    elif by_time:
+        points = await _time_points(model, filter, partitions)
+    else:
+        points = await _sample_points(model, filter, partitions)
+
+    return [
+        Partition(lower, upper)
+        for lower, upper in zip([None, *points], [*points, None], strict=True)
+    ]
+
+
+async def parallel_scan(
+    model: type[T],
+    filter: Mapping[str, Any] | None = None,  # noqa: A002
+    partitions: int = DEFAULT_PARTITIONS,
+    *,
+    by_time: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    queue_size: int = DEFAULT_SCAN_QUEUE_SIZE,
+    **kwargs: Any,
+) -> AsyncGenerator[T, None]:
+    """
+    Yield models matching `filter` read by concurrent cursors over `_id` ranges.
+
+    Every partition (see `split`) is read by its own cursor in batches of
+    `batch_size`. Batches are yielded in the order they arrive, so models
+    are not sorted. At most `queue_size` batches wait for the consumer, then
+    reading stops until the consumer catches up. `kwargs` are passed to `find`,
+    with `executor` documents are decoded in it (process pools included).
+    """
+    ranges = await split(model, filter, partitions, by_time=by_time)
+    queue: asyncio.Queue[list[T] | BaseException | None] = asyncio.Queue(queue_size)
+    readers = [
+        asyncio.create_task(
+            _read(
+                model.find(_filter(filter, part), batch_size=batch_size, **kwargs),
+                queue,
+                batch_size,
+            ),
+        )
+        for part in ranges
+    ]
+
+    try:
+        running = len(readers)
+        while running:
+            batch = await _get(queue)
+            if batch is None:
+                running -= 1
+                continue
+            for doc in batch:
+                yield doc
+    finally:
+        for reader in readers:
+            reader.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+
+
+async def scan_partitions(
+    model: type[T],
+    worker: Callable[[MotorCursor[T]], Awaitable[R]],
+    filter: Mapping[str, Any] | None = None,  # noqa: A002
+    partitions: int = DEFAULT_PARTITIONS,
+    *,
+    by_time: bool = False,
+    **kwargs: Any,
+) -> list[R]:
+    """
+    Run `worker` for the cursor of every partition concurrently.
+
+    Results are returned in `_id` order of partitions. `kwargs` are passed
+    to `find`.
+    """
+    ranges = await split(model, filter, partitions, by_time=by_time)
+    return list(
+        await asyncio.gather(
+            *(worker(model.find(_filter(filter, part), **kwargs)) for part in ranges),
+        ),
+    )
+
+
+def _filter(
+    filter: Mapping[str, Any] | None,  # noqa: A002
+    part: Partition,
+) -> dict[str, Any]:
+    query = dict(filter or {})
+    predicate = part.predicate()
+    if query and predicate:
+        return {"$and": [query, predicate]}
+    return query or predicate
+
+
+async def _get(
+    queue: asyncio.Queue[list[T] | BaseException | None],
+) -> list[T] | None:
+    batch = await queue.get()
+    if isinstance(batch, BaseException):
+        raise batch
+    return batch
+
+
+async def _read(
+    cursor: MotorCursor[T],
+    queue: asyncio.Queue[list[T] | BaseException | None],
+    batch_size: int,
+) -> None:
+    try:
+        batch: list[T] = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                await queue.put(batch)
+                batch = []
+        if batch:
+            await queue.put(batch)
+        await queue.put(None)
+    except Exception as exc:  # noqa: BLE001
+        await queue.put(exc)
+
+
+async def _sample_points(
+    model: type[T],
+    filter: Mapping[str, Any],  # noqa: A002
+    partitions: int,
+) -> list[Any]:
+    pipeline = [
+        {"$match": dict(filter)},
+        {"$sample": {"size": partitions * SAMPLES_PER_PARTITION}},
+        {"$project": {"_id": 1}},
+    ]
+    ids = sorted({doc["_id"] async for doc in model.collection.aggregate(pipeline)})
+    if not ids:
+        return []
+    # квантили выборки, совпавшие границы убираем
+    points = [ids[len(ids) * i // partitions] for i in range(1, partitions)]
+    return list(dict.fromkeys(points))
+
+
+async def _time_points(
+    model: type[T],
+    filter: Mapping[str, Any],  # noqa: A002
+    partitions: int,
+) -> list[Any]:
+    first = await model.collection.find_one(filter, {"_id": 1}, sort=[("_id", 1)])
+    last = await model.collection.find_one(filter, {"_id": 1}, sort=[("_id", -1)])
+    if first is None or last is None:
+        return []
+    if not isinstance(first["_id"], ObjectId) or not isinstance(last["_id"], ObjectId):
+        raise ModelPartitionError(model)
+
+    start = first["_id"].generation_time
+    step = (last["_id"].generation_time - start) / partitions
+    points = [ObjectId.from_datetime(start + step * i) for i in range(1, partitions)]
+    return [
+        point for point in dict.fromkeys(points) if first["_id"] < point <= last["_id"]
+    ]
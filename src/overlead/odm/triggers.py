@@ -1,9 +1,20 @@
-from collections.abc import Awaitable, Callable, Generator
-from typing import Concatenate, Generic, ParamSpec, Self, TypeAlias, TypeVar
+from collections.abc import Awaitable, Callable, Generator, Iterable, Sequence
+from typing import (
+    Any,
+    ClassVar,
+    Concatenate,
+    Generic,
+    ParamSpec,
+    Self,
+    TypeAlias,
+    TypeVar,
+)
 
 from mypy_extensions import Arg
 from pydantic import BaseModel
 
+from overlead.odm.errors import TriggerBackgroundError
+
 P = ParamSpec("P")
 C = TypeVar("C")
 A = TypeVar("A", bound=BaseModel)
@@ -12,10 +23,29 @@ MbAwaitable: TypeAlias = Awaitable[C] | C
 
 
 class trigger(Generic[A, P, R_co]):  # noqa: N801
-    """base trigger class."""
+    """
+    base trigger class.
+
+    Triggers of a phase run in declaration order, then `independent` ones
+    run concurrently. `background` triggers (only `after_*`) are queued to
+    the model `trigger_runner` and do not delay the method.
+    """
+
+    deferrable: ClassVar[bool] = False
+
+    def __init__(
+        self,
+        reference_field: str | None = None,
+        *,
+        independent: bool = False,
+        background: bool = False,
+    ) -> None:
+        if background and not self.deferrable:
+            raise TriggerBackgroundError(type(self).__name__)
 
-    def __init__(self, reference_field: str | None = None) -> None:
         self.reference = reference_field
+        self.independent = independent
+        self.background = background
 
     def __call__(
         self,
@@ -44,6 +74,8 @@ class before_save(trigger[A, [], None]):  # noqa: N801
 class after_save(trigger[A, [Arg(bool, "created")], None]):  # noqa: N801
     """trigger after method `save`."""
 
+    deferrable = True
+
 
 class before_create(trigger[A, [], None]):  # noqa: N801
     """trigger before method `save` if creating."""
@@ -52,6 +84,8 @@ class before_create(trigger[A, [], None]):  # noqa: N801
 class after_create(trigger[A, [], None]):  # noqa: N801
     """trigger after method `save` if created."""
 
+    deferrable = True
+
 
 class before_update(trigger[A, [], None]):  # noqa: N801
     """trigger before method `save` if updating."""
@@ -60,6 +94,8 @@ class before_update(trigger[A, [], None]):  # noqa: N801
 class after_update(trigger[A, [], None]):  # noqa: N801
     """trigger after method `save` if updated."""
 
+    deferrable = True
+
 
 class before_delete(trigger[A, [], None]):  # noqa: N801
     """trigger before method `delete`."""
@@ -67,3 +103,91 @@ class before_delete(trigger[A, [], None]):  # noqa: N801
 
 class after_delete(trigger[A, [], None]):  # noqa: N801
     """trigger after method `delete`."""
+
+    deferrable = True
+
+
+class batch_trigger(trigger[A, P, R_co]):  # noqa: N801
+    """base trigger class of bulk operations, callback gets the model class."""
+
+
+class before_save_many(batch_trigger[A, [Arg(list[A], "docs")], None]):  # noqa: N801
+    """trigger before method `save_many` for each batch."""
+
+
+class after_save_many(batch_trigger[A, [Arg(list[A], "docs")], None]):  # noqa: N801
+    """trigger after method `save_many` for each batch."""
+
+    deferrable = True
+
+
+class before_insert_many(  # noqa: N801
+    batch_trigger[A, [Arg(list[Any], "documents")], None],
+):
+    """trigger before method `insert_many`."""
+
+
+class after_insert_many(  # noqa: N801
+    batch_trigger[A, [Arg(list[Any], "documents"), Arg(Any, "result")], None],
+):
+    """trigger after method `insert_many`."""
+
+    deferrable = True
+
+
+class before_update_many(  # noqa: N801
+    batch_trigger[A, [Arg(Any, "filter"), Arg(Any, "update")], None],
+):
+    """trigger before method `update_many`."""
+
+
+class after_update_many(  # noqa: N801
+    batch_trigger[
+        A,
+        [Arg(Any, "filter"), Arg(Any, "update"), Arg(Any, "result")],
+        None,
+    ],
+):
+    """trigger after method `update_many`."""
+
+    deferrable = True
+
+
+class before_delete_many(batch_trigger[A, [Arg(Any, "filter")], None]):  # noqa: N801
+    """trigger before method `delete_many`."""
+
+
+class after_delete_many(  # noqa: N801
+    batch_trigger[A, [Arg(Any, "filter"), Arg(Any, "result")], None],
+):
+    """trigger after method `delete_many`."""
+
+    deferrable = True
+
+
+class before_bulk_write(  # noqa: N801
+    batch_trigger[A, [Arg(Sequence[Any], "requests")], None],
+):
+    """trigger before method `bulk_write`."""
+
+
+class after_bulk_write(  # noqa: N801
+    batch_trigger[A, [Arg(Sequence[Any], "requests"), Arg(Any, "result")], None],
+):
+    """trigger after method `bulk_write`."""
+
+    deferrable = True
+
+
+AnyTrigger: TypeAlias = "trigger[Any, Any, Any]"
+TriggerTable: TypeAlias = dict[type[AnyTrigger], tuple[AnyTrigger, ...]]
+
+
+def build_trigger_table(triggers: Iterable[AnyTrigger]) -> TriggerTable:
+    """Таблица тригеров по их типам и базовым типам."""
+    table: dict[type[AnyTrigger], list[AnyTrigger]] = {}
+    for trig in triggers:
+        for type_ in type(trig).__mro__:
+            if issubclass(type_, trigger):
+                table.setdefault(type_, []).append(trig)
+    return {type_: tuple(trigs) for type_, trigs in table.items()}
@@ -1,18 +1,49 @@
 import pickle
-from collections.abc import Callable
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Mapping,
+)
+from datetime import date, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from types import NoneType
 from typing import Any, TypeVar
+from uuid import UUID
 
 import orjson
-from bson import Binary
+from bson import Binary, Decimal128, ObjectId
 from bson.binary import USER_DEFINED_SUBTYPE
 from bson.codec_options import TypeDecoder
 from pydantic.typing import is_namedtuple as _is_namedtuple
 from pydantic.utils import sequence_like as _sequence_like
 
-from overlead.odm.types import undefined
+from overlead.odm.types import UndefinedType, undefined
 
 T = TypeVar("T", bound=object)
 
+IMMUTABLE_TYPES = (
+    NoneType,
+    UndefinedType,
+    bool,
+    int,
+    float,
+    Decimal,
+    Decimal128,
+    str,
+    bytes,
+    date,
+    time,
+    timedelta,
+    UUID,
+    ObjectId,
+    Enum,
+    frozenset,
+)
+_IMMUTABLE_TYPES_EXACT = frozenset(IMMUTABLE_TYPES)
+
 
 def exclude_values(v: T, value: tuple[Any, ...]) -> T:
     """Исключить указанные значение из обьекта."""
@@ -51,6 +82,39 @@ def exclude_nullable_values(v: T) -> T:
     return exclude_values(v, (undefined, None))
 
 
+def mutable_keys(values: Mapping[str, Any]) -> list[str]:
+    """Ключи значений, которые можно изменить без присваивания."""
+    return [
+        key
+        for key, v in values.items()
+        if type(v) not in _IMMUTABLE_TYPES_EXACT and not isinstance(v, IMMUTABLE_TYPES)
+    ]
+
+
+async def abatched(
+    iterable: Iterable[T] | AsyncIterable[T],
+    size: int,
+) -> AsyncIterator[list[T]]:
+    """Разбить синхронный или асинхронный итератор на списки по `size` элементов."""
+    batch: list[T] = []
+
+    if isinstance(iterable, AsyncIterable):
+        async for item in iterable:
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    else:
+        for item in iterable:
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
+
+
 def json_dumps(
     v: Any,
     *,
@@ -0,0 +1,73 @@
+from typing import Any
+
+import pytest
+from bson import ObjectId
+
+from overlead.odm.motor import QueryAdvisor
+from overlead.odm.motor.advisor import filter_shape, is_covered, sort_shape
+from overlead.odm.motor.model import ObjectIdModel
+
+
+class Order(ObjectIdModel):
+    status: str
+    created: int
+    total: int
+
+    class Meta:
+        collection_name = "advisor_orders"
+        indexes = (["status", "-created", "total"],)
+
+
+KEYS = [(("_id", 1),), (("status", 1), ("created", -1), ("total", 1))]
+
+
+@pytest.mark.parametrize(
+    ("filter_", "sort", "covered"),
+    [
+        ({}, None, True),
+        ({"_id": 1}, None, True),
+        ({"status": "new"}, None, True),
+        ({"status": {"$in": ["new", "paid"]}}, [("created", -1)], True),
+        ({"status": "new"}, [("created", 1)], True),
+        ({"status": "new", "created": {"$gt": 1}}, None, True),
+        ({"status": "new", "total": {"$gt": 1}}, [("created", -1)], True),
+        ({"created": 1}, None, False),
+        ({"status": "new"}, [("total", 1)], False),
+        ({"status": "new"}, [("created", -1), ("total", -1)], False),
+        ({"status": {"$ne": "new"}}, None, False),
+        ({"$or": [{"status": "new"}, {"_id": 1}]}, None, True),
+        ({"$or": [{"status": "new"}, {"total": 1}]}, None, False),
+        ({"$and": [{"status": "new"}, {"total": 1}]}, None, True),
+        ({"$text": {"$search": "a"}}, None, False),
+    ],
+)
+def test_is_covered(filter_: dict[str, Any], sort: Any, covered: bool) -> None:
+    assert is_covered(KEYS, filter_shape(filter_), sort_shape(sort)) is covered
+
+
+async def test_advisor() -> None:
+    await Order.find_one({"status": "new"})
+
+    with QueryAdvisor() as advisor:
+        assert QueryAdvisor.current() is advisor
+        for status in ("new", "paid"):
+            await Order.find({"status": status}, sort=[("created", -1)]).to_list(None)
+        await Order.count_documents({"total": {"$gte": 10}})
+        await Order.find_one(ObjectId())
+        await Order.delete_many({"total": {"$gte": 10}})
+
+    assert QueryAdvisor.current() is None
+    await Order.count_documents({"total": 1})
+
+    covered, unindexed, by_id = advisor.report()
+    assert covered.shape.filter == (("status", "eq"),)
+    assert covered.shape.sort == (("created", -1),)
+    assert covered.runs == 2  # noqa: PLR2004
+    assert covered.covered
+    assert covered.operations == ("find",)
+
+    assert advisor.unindexed() == [unindexed]
+    assert unindexed.shape.filter == (("total", "range"),)
+    assert unindexed.operations == ("count_documents", "delete_many")
+    assert by_id.shape.filter == (("_id", "eq"),)
+    assert by_id.covered
@@ -0,0 +1,63 @@
+from overlead.odm.motor import LRUCache, QueryCache
+from overlead.odm.motor.model import ObjectIdModel
+
+cache = QueryCache()
+
+
+class Setting(ObjectIdModel):
+    name: str
+    value: int = 0
+
+    class Meta:
+        collection_name = "cache_settings"
+        query_cache = cache
+
+
+async def test_query_cache() -> None:
+    namespace = Setting.collection.full_name
+    setting = await Setting(name="a").save()
+
+    first = await Setting.find_one({"name": "a"})
+    second = await Setting.find_one({"name": "a"})
+    assert first == second == setting
+    assert first is not second
+    assert await Setting.find_one({"name": "b"}) is None
+    assert await Setting.find_one({"name": "b"}) is None
+    assert cache.stats(namespace) == (2, 2)
+
+    assert await Setting.count_documents({}) == 1
+    assert [doc.name for doc in await Setting.find({}).to_list(None)] == ["a"]
+    assert await Setting.count_documents({}) == 1
+    assert len(await Setting.find({}).to_list(None)) == 1
+    assert cache.stats(namespace) == (4, 4)
+
+    setting.value = 1
+    await setting.save()
+    loaded = await Setting.find_one({"name": "a"})
+    assert loaded is not None
+    assert loaded.value == 1
+
+    await Setting.insert_many([Setting(name="b")])
+    assert await Setting.count_documents({}) == 2  # noqa: PLR2004
+    await Setting.delete_many({"name": "b"})
+    assert await Setting.count_documents({}) == 1
+
+    stats = cache.stats()
+    assert stats == (4, 7)
+    assert round(stats.ratio, 2) == 0.36  # noqa: PLR2004
+
+
+def test_lru_cache() -> None:
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert len(lru) == 2  # noqa: PLR2004
+
+    expired = LRUCache(ttl=0)
+    expired.set("a", 1)
+    assert expired.get("a") is None
+    assert len(expired) == 0
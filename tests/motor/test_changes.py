@@ -0,0 +1,146 @@
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+from bson import ObjectId
+
+from overlead.odm.motor import ChangeWatcher, IdentityMap, QueryCache
+from overlead.odm.motor.changes import MemoryTokenStore
+from overlead.odm.motor.model import ObjectIdModel
+
+
+class Config(ObjectIdModel):
+    name: str
+
+    class Meta:
+        collection_name = "changes_config"
+        query_cache = QueryCache()
+
+
+def change(operation: str, id_: Any, **document: Any) -> dict[str, Any]:
+    return {
+        "operationType": operation,
+        "ns": {"db": Config.database_name, "coll": Config.collection_name},
+        "documentKey": {"_id": id_},
+        "fullDocument": {"_id": id_, **document} if document else None,
+    }
+
+
+async def wait_for(predicate: Callable[[], bool]) -> None:
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0.05)
+    raise TimeoutError
+
+
+async def test_apply() -> None:
+    watcher = ChangeWatcher(Config.database.client)
+    materialized = watcher.watch(Config, materialize=True)
+    assert materialized is not None
+    assert watcher.watch(Config) is materialized
+    assert ChangeWatcher.of(Config.database.client) is ChangeWatcher.of(
+        Config.database.client,
+    )
+
+    doc = await Config(name="a").save()
+    watcher.apply(change("insert", ObjectId(), name="early"))
+    assert not materialized.loaded
+    assert len(materialized) == 0
+
+    await materialized.load()
+    assert materialized.staleness is not None
+    assert [item.name for item in materialized] == ["a"]
+
+    id_ = ObjectId()
+    watcher.apply(change("insert", id_, name="b"))
+    loaded = materialized.get(id_)
+    assert loaded is not None
+    assert loaded.name == "b"
+    assert len(materialized) == 2  # noqa: PLR2004
+
+    watcher.apply(change("delete", id_))
+    assert materialized.get(id_) is None
+
+    cache = Config.__meta__.query_cache
+    assert cache is not None
+    await Config.find_one({"name": "a"})
+    await Config.find_one({"name": "a"})
+    assert cache.stats().hits == 1
+
+    with IdentityMap() as imap:
+        watcher.attach(imap)
+        await Config.find_one({"_id": doc.id})
+        assert len(imap) == 1
+
+        watcher.apply(change("update", doc.id, name="c"))
+        assert len(imap) == 0
+        await Config.find_one({"name": "a"})
+        assert cache.stats().hits == 1
+
+    watcher.apply({"operationType": "drop", "ns": change("drop", None)["ns"]})
+    assert not materialized.loaded
+    watcher.apply(change("insert", ObjectId(), name="dropped"))
+    assert not materialized.loaded
+    assert materialized.staleness is None
+
+
+async def test_run_without_models() -> None:
+    watcher = ChangeWatcher(Config.database.client)
+    await asyncio.wait_for(watcher.run(), 1)
+
+
+async def test_watch() -> None:
+    watcher = ChangeWatcher(Config.database.client)
+    materialized = watcher.watch(Config, materialize=True)
+    assert materialized is not None
+
+    watcher.start()
+    try:
+        await wait_for(lambda: materialized.loaded)
+        doc = await Config(name="watched").save()
+        await wait_for(lambda: materialized.get(doc.id) is not None)
+        assert await watcher.token_store.load(watcher.key) is not None
+    finally:
+        await watcher.stop()
+
+
+async def test_model_watch() -> None:
+    # the stream starts from a token taken before the writes
+    async with Config.collection.watch() as stream:
+        await stream.try_next()
+        start = stream.resume_token
+
+    store = MemoryTokenStore()
+    events = Config.watch(
+        full_document="updateLookup",
+        resume_after=start,
+        token_store=store,
+    )
+
+    doc = await Config(name="first").save()
+    event = await anext(events)
+    assert event.operation == "insert"
+    assert event.id == doc.id
+    assert isinstance(event.document, Config)
+    assert event.document.name == "first"
+
+    doc.name = "second"
+    await doc.save()
+    event = await anext(events)
+    assert event.operation == "update"
+    assert event.update is not None
+    assert event.update.updated_fields == {"name": "second"}
+    assert event.document is not None
+    assert event.document.name == "second"
+    await events.aclose()
+
+    # the update was not acknowledged by the next read, so it is replayed
+    await doc.delete()
+    operations = []
+    async for event in Config.watch(token_store=store):
+        operations.append(event.operation)
+        if event.operation == "delete":
+            assert event.document is None
+            break
+    assert operations == ["update", "delete"]
@@ -0,0 +1,66 @@
+from overlead.odm.fields import Reference
+from overlead.odm.motor import IdentityMap
+from overlead.odm.motor.model import ObjectIdModel
+
+
+class Author(ObjectIdModel):
+    name: str
+
+    class Meta:
+        collection_name = "identity_authors"
+
+
+class Post(ObjectIdModel):
+    author: Reference[Author]
+
+    class Meta:
+        collection_name = "identity_posts"
+
+
+async def test_identity_map_find_one() -> None:
+    author = await Author(name="name").save()
+
+    assert await Author.find_one({"_id": author.id}) is not author
+
+    with IdentityMap() as imap:
+        assert IdentityMap.current() is imap
+        loaded = await Author.find_one({"_id": author.id})
+        assert loaded is not None
+        assert await Author.find_one({"_id": author.id}) is loaded
+        assert await Author.find_one({"name": "name"}) is loaded
+        assert (imap.hits, imap.misses) == (1, 1)
+
+    assert IdentityMap.current() is None
+
+
+async def test_identity_map_reference_load() -> None:
+    with IdentityMap() as imap:
+        author = await Author(name="name").save()
+        posts = [
+            await Post(author=author).save()  # type: ignore[arg-type]
+            for _ in range(3)
+        ]
+
+        authors = [await post.author.load() for post in posts]
+        assert all(value is author for value in authors)
+        assert (imap.hits, imap.misses) == (3, 0)
+
+
+async def test_identity_map_find_and_delete() -> None:
+    await Author.insert_many([Author(name=str(i)) for i in range(3)])
+
+    with IdentityMap() as imap:
+        authors = await Author.find({}).to_list(None)
+        assert len(imap) == len(authors)
+        assert [doc async for doc in Author.find({})] == authors
+        assert all(
+            a is b
+            for a, b in zip(authors, await Author.find({}).to_list(None), strict=True)
+        )
+
+        partial = await Author.find_one({"_id": authors[0].id}, fields=["name"])
+        assert partial is not authors[0]
+
+        await authors[0].delete()
+        assert len(imap) == len(authors) - 1
+        assert await Author.find_one({"_id": authors[0].id}) is None
@@ -1,11 +1,22 @@
+import asyncio
+from collections.abc import AsyncIterator  # noqa: TCH003
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
 from random import randint
 from typing import Any
 
 import pytest
 from pymongo import InsertOne
+from pymongo.errors import BulkWriteError, WriteError
 
 from overlead.odm import triggers
-from overlead.odm.errors import ModelNotCreatedError
+from overlead.odm.errors import (
+    IndexRebuildError,
+    ModelFieldError,
+    ModelNotCreatedError,
+    ModelUpsertKeyError,
+)
+from overlead.odm.fields import ObjectId
 from overlead.odm.motor.model import ObjectIdModel
 from overlead.odm.types import Undefined, isnotundefined, undefined
 
@@ -50,6 +61,90 @@ async def test_ensure_all_indexes() -> None:
     )
 
 
+async def test_ensure_indexes_report() -> None:
+    await Motor.collection.drop_indexes()
+    report = await Motor.ensure_indexes()
+    assert report.collection == "motor"
+    assert report.created == ("value_1", "value_hashed", "value_-1", "_id_1_value_1")
+    assert report.skipped == ("_id_1",)
+    assert report.conflicts == ()
+
+    report = await Motor.ensure_indexes()
+    assert report.created == report.conflicts == ()
+    assert len(report.skipped) == 5  # noqa: PLR2004
+
+    await Motor.collection.drop_index("value_-1")
+    await Motor.collection.create_index([("value", -1)])
+    (report,) = (
+        report
+        for report in await Motor.ensure_all_indexes()
+        if report.collection == "motor"
+    )
+    assert report.created == ()
+    assert report.conflicts == ("value_-1",)
+
+
+async def test_plan_indexes() -> None:
+    await Motor.collection.drop_indexes()
+    await Motor.collection.create_index([("value", -1)])
+    await Motor.collection.create_index("extra")
+
+    plan = await Motor.plan_indexes()
+    assert [index.name for index in plan.create] == [
+        "value_1",
+        "value_hashed",
+        "_id_1_value_1",
+    ]
+    assert [(name, index.name) for name, index in plan.rebuild] == [
+        ("value_-1", "value_-1"),
+    ]
+    assert plan.modify == ()
+    assert plan.drop == ("extra_1",)
+
+    await Motor.apply_indexes(plan, drop=True, hidden_staging=False)
+    assert (await Motor.plan_indexes()).empty
+    info = await Motor.collection.index_information()
+    assert info["value_-1"]["unique"]
+    assert "extra_1" not in info
+    assert "value_-1_staged" not in info
+
+
+async def test_plan_shared_indexes() -> None:
+    class SharedA(ObjectIdModel):
+        value: int
+
+        class Meta:
+            collection_name = "motor_shared"
+            indexes = (("value", {"name": "by_value"}),)
+
+    class SharedB(ObjectIdModel):
+        name: str = ""
+
+        class Meta:
+            collection_name = "motor_shared"
+            indexes = ("name",)
+
+    await SharedA.collection.create_index([("value", -1)], name="by_value")
+    plan = await SharedA.plan_indexes()
+    assert [index.name for index in plan.create] == ["name_1"]
+    assert [(name, index.name) for name, index in plan.rebuild] == [
+        ("by_value", "by_value"),
+    ]
+    assert plan.drop == ()
+
+    await SharedA.apply_indexes(plan, hidden_staging=False)
+    info = await SharedA.collection.index_information()
+    assert info["by_value"]["key"] == [("value", 1)]
+    assert "by_value_staged" not in info
+    assert (await SharedB.plan_indexes()).empty
+
+    await SharedA.collection.drop_index("by_value")
+    await SharedA.collection.create_index("value", name="by_value", unique=True)
+    with pytest.raises(IndexRebuildError):
+        await SharedA.apply_indexes()
+    assert (await SharedA.collection.index_information())["by_value"]["unique"]
+
+
 async def test_motor_save_new() -> None:
     assert await Motor.count_documents({}) == 0
 
@@ -88,6 +183,36 @@ async def test_motor_update() -> None:
     assert value.value is undefined
 
 
+async def test_motor_update_inplace() -> None:
+    class MotorDict(Motor):
+        counters: dict[str, int] = {}
+
+    model = await MotorDict(value=1).save()
+    model.counters["a"] = 1
+    await model.save()
+
+    value = await MotorDict.find_one({"_id": model.id})
+    assert value
+    assert value.counters == {"a": 1}
+
+
+async def test_motor_update_nested() -> None:
+    class MotorNested(Motor):
+        nested: dict[str, Any] = {}
+        items: list[int] = []
+
+    values = {str(i): i for i in range(10)}
+    model = await MotorNested(value=1, nested={**values, "a": 1}, items=[1]).save()
+    model.nested["a"] = 2
+    model.items.extend([2, 3])
+    await model.save()
+
+    value = await MotorNested.find_one({"_id": model.id})
+    assert value
+    assert value.nested == {**values, "a": 2}
+    assert value.items == [1, 2, 3]
+
+
 async def test_motor_delete() -> None:
     assert await Motor.count_documents({}) == 0
 
@@ -186,3 +311,328 @@ async def test_trigger() -> None:
 async def test_upload_file_empty(value: Any) -> None:
     data = await Motor.upload_file("file", value)
     assert data == value
+
+
+async def test_motor_find_trusted() -> None:
+    for ind in range(10):
+        await Motor(value=ind).save()
+
+    models = await Motor.find({}, trusted=True).to_list(None)
+    assert models == await Motor.find({}).to_list(None)
+
+    model = await Motor.find_one({"value": 1}, trusted=True)
+    assert model
+    assert model.value == 1
+
+
+@pytest.mark.parametrize("executor", [ThreadPoolExecutor, ProcessPoolExecutor])
+async def test_motor_find_executor(
+    executor: type[ThreadPoolExecutor | ProcessPoolExecutor],
+) -> None:
+    await Motor.insert_many([Motor(value=ind) for ind in range(10)])
+
+    with executor(max_workers=2) as pool:
+        models = await Motor.find({}, executor=pool, batch_size=3).to_list(None)
+        assert [model.value for model in models] == list(range(10))
+
+        values = [
+            model.value
+            async for model in Motor.find({}, executor=pool, batch_size=3)
+        ]
+        assert values == list(range(10))
+
+
+async def test_motor_find_raw() -> None:
+    await Motor.insert_many([Motor(value=ind) for ind in range(3)])
+
+    models = await Motor.find({}, raw=True).to_list(None)
+    assert [model.value for model in models] == [0, 1, 2]
+
+    model = await Motor.find_one({"value": 1}, raw=True)
+    assert model
+    model.value = 10
+    await model.save()
+    assert await Motor.count_documents({"value": 10}) == 1
+
+
+async def test_motor_find_fields() -> None:
+    class MotorFields(Motor):
+        name: str
+        tags: list[str] = []
+
+    await MotorFields(value=1, name="name", tags=["a"]).save()
+
+    models = await MotorFields.find({}, fields=["value"]).to_list(None)
+    assert len(models) == 1
+    model = models[0]
+    assert model.value == 1
+    assert model.name is undefined  # type: ignore[comparison-overlap]
+    assert model.tags is undefined  # type: ignore[comparison-overlap]
+
+    model.value = 2
+    await model.save()
+    value = await MotorFields.find_one({"_id": model.id})
+    assert value
+    assert (value.value, value.name, value.tags) == (2, "name", ["a"])
+
+    partial = await MotorFields.find_one({"_id": model.id}, fields=["tags"])
+    assert partial
+    assert partial.tags == ["a"]
+    partial.tags.append("b")
+    partial.name = "new name"
+    await partial.save()
+    value = await MotorFields.find_one({"_id": model.id})
+    assert value
+    assert (value.value, value.name, value.tags) == (2, "new name", ["a", "b"])
+
+    with pytest.raises(ModelFieldError):
+        MotorFields.find({}, fields=["unknown"])
+
+
+async def test_motor_save_many() -> None:
+    called: list[tuple[int, bool]] = []
+
+    class MotorMany(Motor):
+        @triggers.after_save()
+        def on_save(self, created: bool) -> None:
+            called.append((self.value, created))
+
+    models = await MotorMany.save_many(
+        [MotorMany(value=ind) for ind in range(5)],
+        batch_size=2,
+    )
+    assert all(model.is_created for model in models)
+    assert sorted(called) == [(ind, True) for ind in range(5)]
+    assert await MotorMany.count_documents({}) == len(models)
+
+    called.clear()
+    models[0].value = 10
+    models = [*models, MotorMany(value=5)]
+    await MotorMany.save_many(models)
+    assert sorted(called) == [
+        *((ind, False) for ind in range(1, 5)),
+        (5, True),
+        (10, False),
+    ]
+    assert await MotorMany.count_documents({"value": 10}) == 1
+    assert models[0]._get_updates()[0] == {}  # noqa: SLF001
+
+
+async def test_motor_save_many_error() -> None:
+    class MotorUnique(Motor):
+        class Meta:
+            collection_name = "motor_unique"
+
+    await MotorUnique.collection.create_index("value", unique=True)
+    await MotorUnique(value=1).save()
+
+    models = [MotorUnique(value=0), MotorUnique(value=1), MotorUnique(value=2)]
+    with pytest.raises(BulkWriteError):
+        await MotorUnique.save_many(models)
+    assert [model.is_created for model in models] == [True, False, True]
+
+    models = [MotorUnique(value=3), MotorUnique(value=1), MotorUnique(value=4)]
+    with pytest.raises(BulkWriteError):
+        await MotorUnique.save_many(models, ordered=True)
+    assert [model.is_created for model in models] == [True, False, False]
+
+
+async def test_motor_coalesce_writes(monkeypatch: pytest.MonkeyPatch) -> None:
+    class MotorCoalesce(Motor):
+        class Meta:
+            collection_name = "motor_coalesce"
+            coalesce_writes = True
+            coalesce_max_batch = 4
+
+    calls: list[int] = []
+    bulk_write = MotorCoalesce.bulk_write
+
+    def bulk_write_mock(requests: Any, **kwargs: Any) -> Any:
+        calls.append(len(requests))
+        return bulk_write(requests, **kwargs)
+
+    monkeypatch.setattr(MotorCoalesce, "bulk_write", bulk_write_mock)
+    await MotorCoalesce.collection.create_index("value", unique=True)
+
+    models = [MotorCoalesce(value=ind) for ind in range(6)]
+    await asyncio.gather(*(model.save() for model in models))
+    assert calls == [4, 2]
+    assert all(model.is_created for model in models)
+
+    models[0].value = 10
+    models[1].value = 2
+    results = await asyncio.gather(
+        models[0].save(),
+        models[1].save(),
+        return_exceptions=True,
+    )
+    assert calls == [4, 2, 2]
+    assert results[0] is models[0]
+    assert isinstance(results[1], WriteError)
+    assert await MotorCoalesce.count_documents({"value": 10}) == 1
+
+    models[1].value = 10
+    models[0].value = 12
+    results = await asyncio.gather(
+        models[1].save(),
+        models[0].save(),
+        return_exceptions=True,
+    )
+    assert calls == [4, 2, 2, 2]
+    assert isinstance(results[0], WriteError)
+    assert results[1] is models[0]
+    assert await MotorCoalesce.count_documents({"value": 12}) == 1
+
+    models[0].value = 11
+    save = asyncio.ensure_future(models[0].save())
+    await asyncio.sleep(0)
+    assert MotorCoalesce._coalescer  # noqa: SLF001
+    assert len(MotorCoalesce._coalescer) == 1  # noqa: SLF001
+    await MotorCoalesce.flush_writes()
+    assert save.done()
+    assert await MotorCoalesce.count_documents({"value": 11}) == 1
+
+
+async def test_motor_insert_stream() -> None:
+    models = [Motor(value=ind) for ind in range(5)]
+
+    async def documents() -> AsyncIterator[Motor | dict[str, Any]]:
+        for model in models:
+            yield model
+        yield {"value": 5}
+
+    batches = [
+        batch
+        async for batch in Motor.insert_stream(
+            documents(),
+            batch_size=2,
+            max_in_flight=2,
+        )
+    ]
+    assert [(batch.start, batch.size) for batch in batches] == [(0, 2), (2, 2), (4, 2)]
+    assert [len(batch.result.inserted_ids) for batch in batches] == [2, 2, 2]
+    assert all(model.is_created for model in models)
+    assert await Motor.count_documents({}) == len(models) + 1
+
+    batches = [batch async for batch in Motor.insert_stream(iter([Motor(value=6)]))]
+    assert [(batch.start, batch.size) for batch in batches] == [(0, 1)]
+
+    await Motor.delete_many({})
+    id_ = ObjectId()
+    duplicates = [Motor(id=id_, value=7), Motor(id=id_, value=8)]
+    stream = [*duplicates, *(Motor(value=value) for value in range(9, 13))]
+    with pytest.raises(BulkWriteError):
+        [_ async for _ in Motor.insert_stream(iter(stream), batch_size=2)]
+    assert await Motor.count_documents({}) == 1
+
+    await Motor.delete_many({})
+    batches = [
+        batch
+        async for batch in Motor.insert_stream(
+            ({"value": ind} for ind in range(6)),
+            batch_size=2,
+            ordered=False,
+        )
+    ]
+    assert [batch.start for batch in batches] == [0, 2, 4]
+
+
+async def test_motor_insert_stream_overlap(monkeypatch: pytest.MonkeyPatch) -> None:
+    events: list[tuple[str, int]] = []
+    dump = Motor._dump  # noqa: SLF001
+    insert_batch = Motor._insert_batch  # noqa: SLF001
+
+    def dump_mock(self: Motor, include: Any = None) -> dict[str, Any]:
+        events.append(("dump", self.value))
+        return dump(self, include)
+
+    async def insert_batch_mock(start: int, *args: Any) -> Any:
+        await asyncio.sleep(0)
+        result = await insert_batch(start, *args)
+        events.append(("done", start))
+        return result
+
+    monkeypatch.setattr(Motor, "_dump", dump_mock)
+    monkeypatch.setattr(Motor, "_insert_batch", insert_batch_mock)
+
+    models = [Motor(value=ind) for ind in range(3)]
+    [_ async for _ in Motor.insert_stream(iter(models), batch_size=1)]
+    assert events.index(("dump", 1)) < events.index(("done", 0))
+    assert events.index(("dump", 2)) < events.index(("done", 1))
+
+
+async def test_motor_upsert() -> None:
+    class MotorUpsert(Motor):
+        name: str = "default"
+        count: int = 0
+
+        class Meta:
+            collection_name = "motor_upsert"
+
+    model = await MotorUpsert.upsert(MotorUpsert(value=1, count=1), on=["value"])
+    assert model.is_created
+    assert model._get_updates()[0] == {}  # noqa: SLF001
+
+    await MotorUpsert.collection.update_one({"value": 1}, {"$set": {"name": "name"}})
+    other = await MotorUpsert.upsert(MotorUpsert(value=1, count=2), on=["value"])
+    assert other.id == model.id
+    assert (other.name, other.count) == ("name", 2)
+    assert other._get_updates()[0] == {}  # noqa: SLF001
+    await other.save()
+
+    value = await MotorUpsert.find_one({"value": 1})
+    assert value
+    assert (value.name, value.count) == ("name", 2)
+
+    with pytest.raises(ModelUpsertKeyError):
+        await MotorUpsert.upsert(MotorUpsert(value=1), on=["unknown"])
+    with pytest.raises(ModelUpsertKeyError):
+        await MotorUpsert.upsert(MotorUpsert(value=1), on=[])
+
+
+async def test_motor_upsert_many() -> None:
+    class MotorUpsertMany(Motor):
+        count: int = 0
+        tags: list[str] = []
+
+        class Meta:
+            collection_name = "motor_upsert_many"
+
+    first = await MotorUpsertMany(value=2, tags=["a"]).save()
+    models = [MotorUpsertMany(value=ind, count=1) for ind in range(3)]
+    await MotorUpsertMany.upsert_many(models, on=["value"], batch_size=2)
+
+    assert models[2].id == first.id
+    assert all(model.is_created for model in models)
+    assert len({model.id for model in models}) == len(models)
+    assert await MotorUpsertMany.count_documents({"count": 1}) == len(models)
+    assert all(model._get_updates()[0] == {} for model in models)  # noqa: SLF001
+    assert models[2].tags == ["a"]
+
+    await models[2].save()
+    stored = await MotorUpsertMany.find_one({"value": 2})
+    assert stored
+    assert stored.tags == ["a"]
+
+
+async def test_motor_upsert_many_unmatched(monkeypatch: pytest.MonkeyPatch) -> None:
+    class MotorUpsertAt(Motor):
+        at: datetime
+
+        class Meta:
+            collection_name = "motor_upsert_at"
+
+    at = datetime(2023, 1, 1, 0, 0, 0, 123456)  # noqa: DTZ001
+    await MotorUpsertAt(value=1, at=at).save()
+    models = [MotorUpsertAt(value=2, at=at)]
+    await MotorUpsertAt.upsert_many(models, on=["at"])
+    assert models[0].is_created
+    assert models[0].value == 2  # noqa: PLR2004
+
+    def find_nothing(*args: Any, **kwargs: Any) -> Any:
+        return MotorUpsertAt.collection.database["missing"].find(*args, **kwargs)
+
+    monkeypatch.setattr(MotorUpsertAt.collection, "find", find_nothing)
+    models = [MotorUpsertAt(value=3, at=at)]
+    await MotorUpsertAt.upsert_many(models, on=["at"])
+    assert not models[0].is_created
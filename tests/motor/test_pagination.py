@@ -0,0 +1,78 @@
+import pytest
+
+from overlead.odm.errors import ModelPageTokenError, ModelSortIndexError
+from overlead.odm.motor.model import ObjectIdModel
+from overlead.odm.motor.pagination import keyset_filter
+
+
+class Event(ObjectIdModel):
+    status: str
+    created: int
+
+    class Meta:
+        collection_name = "pagination_events"
+        indexes = (["status", "-created", "-_id"],)
+
+
+class EventNoId(ObjectIdModel):
+    status: str
+    created: int
+
+    class Meta:
+        collection_name = "pagination_events_no_id"
+        indexes = (["status", "-created"],)
+
+
+def test_keyset_filter() -> None:
+    assert keyset_filter([("_id", 1)], [1]) == {"_id": {"$gt": 1}}
+    assert keyset_filter([("created", -1), ("_id", -1)], [5, 2]) == {
+        "$or": [
+            {"created": {"$lt": 5}},
+            {"created": 5, "_id": {"$lt": 2}},
+        ],
+    }
+
+
+async def test_paginate() -> None:
+    await Event.insert_many(
+        [Event(status="new", created=i % 4) for i in range(11)]
+        + [Event(status="old", created=1)],
+    )
+    expected = await Event.find(
+        {"status": "new"},
+        sort=[("created", -1), ("_id", -1)],
+    ).to_list(None)
+
+    pages = []
+    after = None
+    while True:
+        page = await Event.paginate(
+            {"status": "new"},
+            sort=[("created", -1)],
+            after=after,
+            limit=3,
+        )
+        pages.append(page.items)
+        if page.next is None:
+            break
+        after = page.next
+
+    assert [len(items) for items in pages] == [3, 3, 3, 2]
+    assert [e.id for items in pages for e in items] == [e.id for e in expected]
+
+
+async def test_paginate_errors() -> None:
+    with pytest.raises(ModelSortIndexError):
+        await Event.paginate({"status": "new"}, sort=[("created", 1), ("_id", -1)])
+    with pytest.raises(ModelSortIndexError):
+        # the index must end with the `_id` tie-breaker
+        await EventNoId.paginate({"status": "new"}, sort=[("created", -1)])
+
+    await Event.insert_many([Event(status="new", created=1) for _ in range(2)])
+    page = await Event.paginate({"status": "new"}, sort=[("created", -1)], limit=1)
+    assert page.next is not None
+
+    with pytest.raises(ModelPageTokenError):
+        await Event.paginate({"status": "new"}, sort=[("created", -1)], after="bad")
+    with pytest.raises(ModelPageTokenError):
+        await Event.paginate({"status": "new"}, after=page.next, check_index=False)
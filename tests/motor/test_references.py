@@ -0,0 +1,156 @@
+from typing import Any
+
+import pytest
+from pydantic import BaseModel
+
+from overlead.odm.errors import ModelFieldError
+from overlead.odm.fields import Reference
+from overlead.odm.motor import Lookup
+from overlead.odm.motor.model import ObjectIdModel
+
+
+class Company(ObjectIdModel):
+    name: str
+
+    class Meta:
+        collection_name = "references_companies"
+
+
+class Author(ObjectIdModel):
+    name: str
+    company: Reference[Company] | None = None
+
+    class Meta:
+        collection_name = "references_authors"
+
+
+class Info(BaseModel):
+    editor: Reference[Author]
+
+
+class Post(ObjectIdModel):
+    author: Reference[Author]
+    readers: list[Reference[Author]] = []
+    info: Info | None = None
+
+    class Meta:
+        collection_name = "references_posts"
+
+
+@pytest.fixture()
+async def authors() -> list[Author]:
+    company = await Company(name="company").save()
+    return [
+        await Author(name=str(i), company=company).save()  # type: ignore[arg-type]
+        for i in range(3)
+    ]
+
+
+async def create_posts(authors: list[Author]) -> None:
+    for author in authors:
+        await Post.parse_obj(
+            {"author": author, "readers": authors, "info": {"editor": author}},
+        ).save()
+
+
+async def test_resolve_references(
+    authors: list[Author],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    await create_posts(authors)
+    posts = await Post.find({}).to_list(None)
+
+    calls: list[Any] = []
+    find = Author.find
+
+    def find_mock(*args: Any, **kwargs: Any) -> Any:
+        calls.append(args)
+        return find(*args, **kwargs)
+
+    monkeypatch.setattr(Author, "find", find_mock)
+
+    await Post.resolve_references(posts, "author", "readers", "info.editor")
+    assert len(calls) == 1
+
+    for post, author in zip(posts, authors, strict=True):
+        assert post.author.document == author
+        assert [reader.document for reader in post.readers] == authors
+        assert post.info
+        assert post.info.editor.document == author
+        assert await post.author.load() is post.author.document
+
+
+async def test_resolve_references_nested(authors: list[Author]) -> None:
+    await create_posts(authors)
+    posts = await Post.find({}).to_list(None)
+
+    await Post.resolve_references(posts, "author.company", chunk_size=2)
+    for post in posts:
+        assert post.author.document
+        assert post.author.document.company
+        assert post.author.document.company.document
+        assert post.author.document.company.document.name == "company"
+
+    with pytest.raises(ModelFieldError):
+        await Post.resolve_references(posts, "author.unknown")
+
+
+async def test_cursor_prefetch(authors: list[Author]) -> None:
+    await create_posts(authors)
+
+    posts = await Post.find({}).prefetch("author").to_list(None)
+    assert [post.author.document for post in posts] == authors
+
+    async for post in Post.find({}, batch_size=2).prefetch("readers"):
+        assert [reader.document for reader in post.readers] == authors
+
+
+def test_lookup_pipeline() -> None:
+    lookup = Lookup(Post, "author", "readers", "info.editor")
+    assert lookup.pipeline == [
+        {
+            "$lookup": {
+                "from": "references_authors",
+                "localField": "author",
+                "foreignField": "_id",
+                "as": "__lookup_0",
+            },
+        },
+        {"$unwind": {"path": "$__lookup_0", "preserveNullAndEmptyArrays": True}},
+        {
+            "$lookup": {
+                "from": "references_authors",
+                "localField": "readers",
+                "foreignField": "_id",
+                "as": "__lookup_1",
+            },
+        },
+        {
+            "$lookup": {
+                "from": "references_authors",
+                "localField": "info.editor",
+                "foreignField": "_id",
+                "as": "__lookup_2",
+            },
+        },
+        {"$unwind": {"path": "$__lookup_2", "preserveNullAndEmptyArrays": True}},
+    ]
+
+    for field in ("unknown", "info", "author.company", "info.unknown"):
+        with pytest.raises(ModelFieldError):
+            Lookup(Post, field)
+
+
+async def test_lookup(authors: list[Author]) -> None:
+    await create_posts(authors)
+
+    posts = await Post.lookup(
+        {},
+        "author",
+        "readers",
+        pipeline=[{"$sort": {"_id": 1}}],
+    )
+    assert [post.author.document for post in posts] == authors
+    for post in posts:
+        assert [reader.document for reader in post.readers] == authors
+        assert "__lookup_0" not in post._olds  # noqa: SLF001
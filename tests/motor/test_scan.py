@@ -0,0 +1,84 @@
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+from bson import ObjectId
+
+from overlead.odm.errors import ModelPartitionError
+from overlead.odm.motor.model import ObjectIdModel
+from overlead.odm.motor.scan import Partition, split
+
+if TYPE_CHECKING:
+    from overlead.odm.motor.cursor import MotorCursor
+
+
+class Item(ObjectIdModel):
+    value: int
+
+    class Meta:
+        collection_name = "scan_items"
+
+
+class Named(ObjectIdModel):
+    value: int
+
+    class Meta:
+        collection_name = "scan_named"
+
+
+def test_partition_predicate() -> None:
+    assert Partition(None, None).predicate() == {}
+    assert Partition(1, None).predicate() == {"_id": {"$gte": 1}}
+    assert Partition(1, 5).predicate() == {"_id": {"$gte": 1, "$lt": 5}}
+
+
+async def test_split() -> None:
+    assert await split(Item, {}, 4) == [Partition(None, None)]
+
+    await Item.insert_many([Item(value=i) for i in range(100)])
+    parts = await split(Item, {}, 4)
+    assert 1 < len(parts) <= 4  # noqa: PLR2004
+    assert parts[0].lower is None
+    assert parts[-1].upper is None
+    assert [part.upper for part in parts[:-1]] == [part.lower for part in parts[1:]]
+    assert await split(Item, {}, 1) == [Partition(None, None)]
+
+
+async def test_split_by_time() -> None:
+    start = datetime(2023, 1, 1, tzinfo=UTC)
+    await Item.collection.insert_many(
+        [
+            {"_id": ObjectId.from_datetime(start + timedelta(hours=i)), "value": i}
+            for i in range(8)
+        ],
+    )
+    parts = await split(Item, {}, 4, by_time=True)
+    assert [part.lower for part in parts[1:]] == [
+        ObjectId.from_datetime(start + timedelta(hours=hours))
+        for hours in (1.75, 3.5, 5.25)
+    ]
+
+    await Named.collection.insert_one({"_id": "a", "value": 1})
+    with pytest.raises(ModelPartitionError):
+        await split(Named, {}, 4, by_time=True)
+
+
+async def test_parallel_scan() -> None:
+    items = [Item(value=i) for i in range(100)]
+    await Item.insert_many(items)
+
+    scanned = [
+        item.value
+        async for item in Item.parallel_scan(
+            {"value": {"$gte": 10}},
+            partitions=4,
+            batch_size=7,
+        )
+    ]
+    assert sorted(scanned) == list(range(10, 100))
+
+    async def count(cursor: "MotorCursor[Item]") -> int:
+        return len(await cursor.to_list(None))
+
+    counts = await Item.scan_partitions(count, {"value": {"$lt": 50}}, partitions=4)
+    assert sum(counts) == 50  # noqa: PLR2004
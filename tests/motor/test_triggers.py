@@ -1,6 +1,11 @@
+import asyncio
+from typing import Any
+
 import pytest
 
 from overlead.odm import triggers
+from overlead.odm.errors import TriggerBackgroundError
+from overlead.odm.motor import BackgroundRunner
 from overlead.odm.motor.model import ObjectIdModel
 
 pytestmark = pytest.mark.asyncio
@@ -164,3 +169,136 @@ async def test_sync() -> None:
 
     await doc.save()
     assert doc.sync is True
+
+
+async def test_independent() -> None:
+    events: list[str] = []
+
+    class MotorIndependent(ObjectIdModel):
+        class Meta:
+            collection_name = "motor_independent"
+
+        @triggers.before_save()
+        async def first(self) -> None:
+            events.append("first")
+
+        @triggers.before_save(independent=True)
+        async def a(self) -> None:
+            events.append("a start")
+            await asyncio.sleep(0)
+            events.append("a end")
+
+        @triggers.before_save(independent=True)
+        async def b(self) -> None:
+            events.append("b start")
+            await asyncio.sleep(0)
+            events.append("b end")
+
+    await MotorIndependent().save()
+    assert events == ["first", "a start", "b start", "a end", "b end"]
+
+
+async def test_batch() -> None:
+    events: list[tuple[str, ...]] = []
+    owners: list[Any] = []
+
+    class MotorBatch(ObjectIdModel):
+        value: int = 0
+
+        class Meta:
+            collection_name = "motor_batch"
+
+        @triggers.before_save()
+        def before_save(self) -> None:
+            events.append(("before_save", str(self.value)))
+
+        @triggers.before_save_many()
+        def before_save_many(cls, docs: list[Any]) -> None:  # noqa: N805
+            owners.append(cls)
+            events.append(("before_save_many", str(len(docs))))
+
+        @triggers.after_save_many()
+        def after_save_many(cls, docs: list[Any]) -> None:  # noqa: N805
+            events.append(("after_save_many", str(len(docs))))
+
+        @triggers.before_update_many()
+        def before_update_many(
+            cls,  # noqa: N805
+            filter: Any,  # noqa: A002, ARG002
+            update: Any,
+        ) -> None:
+            events.append(("before_update_many", str(update)))
+
+        @triggers.after_update_many()
+        def after_update_many(
+            cls,  # noqa: N805
+            filter: Any,  # noqa: A002, ARG002
+            update: Any,  # noqa: ARG002
+            result: Any,
+        ) -> None:
+            events.append(("after_update_many", str(result.modified_count)))
+
+        @triggers.after_delete_many()
+        def after_delete_many(
+            cls,  # noqa: N805
+            filter: Any,  # noqa: A002, ARG002
+            result: Any,
+        ) -> None:
+            events.append(("after_delete_many", str(result.deleted_count)))
+
+    await MotorBatch.save_many([MotorBatch(value=1), MotorBatch(value=2)])
+    assert events == [
+        ("before_save_many", "2"),
+        ("before_save", "1"),
+        ("before_save", "2"),
+        ("after_save_many", "2"),
+    ]
+    assert owners == [MotorBatch]
+
+    events.clear()
+    await MotorBatch.update_many({}, {"$inc": {"value": 1}})
+    await MotorBatch.delete_many({})
+    assert events == [
+        ("before_update_many", "{'$inc': {'value': 1}}"),
+        ("after_update_many", "2"),
+        ("after_delete_many", "2"),
+    ]
+
+
+async def test_background() -> None:
+    events: list[str] = []
+    errors: list[BaseException] = []
+    release = asyncio.Event()
+    runner = BackgroundRunner(concurrency=1, on_error=errors.append)
+
+    class MotorBackground(ObjectIdModel):
+        class Meta:
+            collection_name = "motor_background"
+            trigger_runner = runner
+
+        @triggers.after_save(background=True)
+        async def notify(self, created: bool) -> None:
+            await release.wait()
+            events.append(f"notify {created}")
+
+        @triggers.after_delete(background=True)
+        def fail(self) -> None:
+            raise ValueError
+
+    doc = await MotorBackground().save()
+    await doc.save()
+    assert events == []
+    assert len(runner) == 2  # noqa: PLR2004
+
+    release.set()
+    await doc.delete()
+    await MotorBackground.drain_triggers()
+    assert events == ["notify True", "notify False"]
+    assert len(runner) == 0
+    assert runner.errors == 1
+    assert isinstance(errors[0], ValueError)
+
+
+def test_background_before() -> None:
+    with pytest.raises(TriggerBackgroundError):
+        triggers.before_save(background=True)
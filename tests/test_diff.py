@@ -0,0 +1,60 @@
+from typing import Any
+
+import pytest
+
+from overlead.odm.diff import diff_values
+from overlead.odm.types import undefined
+
+BIG = {f"key_{i}": i for i in range(10)}
+
+
+@pytest.mark.parametrize(
+    ("old", "new", "expect"),
+    [
+        (1, 1, {}),
+        (1, 2, {"$set": {"a": 2}}),
+        (undefined, 1, {"$set": {"a": 1}}),
+        (1, undefined, {"$unset": {"a": ""}}),
+        (undefined, undefined, {}),
+        ([1, 2], (1, 2), {}),
+        ({**BIG, "x": 1}, {**BIG, "x": 2}, {"$set": {"a.x": 2}}),
+        ({**BIG, "x": 1}, BIG, {"$unset": {"a.x": ""}}),
+        (BIG, {**BIG, "x": {"y": 1}}, {"$set": {"a.x": {"y": 1}}}),
+        (
+            {**BIG, "x": {**BIG, "y": 1}},
+            {**BIG, "x": {**BIG, "y": 2}},
+            {"$set": {"a.x.y": 2}},
+        ),
+        (
+            {**BIG, "x": 1, "y": 1},
+            {**BIG, "x": 2},
+            {"$set": {"a.x": 2}, "$unset": {"a.y": ""}},
+        ),
+        ({"x": 1}, {"x": 2}, {"$set": {"a": {"x": 2}}}),
+        ({"x": 1, "y": 1}, {"x": 2, "y": 2}, {"$set": {"a": {"x": 2, "y": 2}}}),
+        ({**BIG, "x.y": 1}, {**BIG, "x.y": 2}, {"$set": {"a": {**BIG, "x.y": 2}}}),
+        ({**BIG, "$x": 1}, {**BIG, "$x": 2}, {"$set": {"a": {**BIG, "$x": 2}}}),
+        ([1, 2, 3], [1, 2, 3, 4], {"$push": {"a": {"$each": [4]}}}),
+        ([1, 2, 3], [1, 2, 3, 4, 5], {"$push": {"a": {"$each": [4, 5]}}}),
+        ([], [1], {"$set": {"a": [1]}}),
+        ([1, 2, 3], [1, 2], {"$set": {"a": [1, 2]}}),
+        ([1, 2, 3], [0, 2, 3, 4], {"$set": {"a": [0, 2, 3, 4]}}),
+        ([1, 2, 3], [1, 0, 3], {"$set": {"a.1": 0}}),
+        ([1, 2, 3], [0, 0, 3], {"$set": {"a.0": 0, "a.1": 0}}),
+        ([1, 2, 3], [0, 0, 0], {"$set": {"a": [0, 0, 0]}}),
+        (
+            [{**BIG, "x": 1}, 2],
+            [{**BIG, "x": 2}, 2],
+            {"$set": {"a.0.x": 2}},
+        ),
+        (
+            {**BIG, "x": [1, 2]},
+            {**BIG, "x": [1, 2, 3]},
+            {"$push": {"a.x": {"$each": [3]}}},
+        ),
+        ({**BIG, "x": [1, 2]}, {**BIG, "x": {"y": 1}}, {"$set": {"a.x": {"y": 1}}}),
+        ([1, 2], {"y": 1}, {"$set": {"a": {"y": 1}}}),
+    ],
+)
+def test_diff_values(old: Any, new: Any, expect: Any) -> None:
+    assert diff_values("a", old, new) == expect
@@ -64,3 +64,25 @@ def test_index(index: Any, expect: Any) -> None:
 def test_index_error(index: Any) -> None:
     with pytest.raises((ValidationError, TypeError)):
         assert not Index.parse_obj(index)
+
+
+def test_index_name() -> None:
+    assert Index.parse_obj("-a #b").name == "a_-1_b_hashed"
+    assert Index.parse_obj(("a", {"name": "custom"})).name == "custom"
+
+
+def test_index_diff() -> None:
+    index = Index.parse_obj(("a @b @c", {"unique": True, "expireAfterSeconds": 10}))
+    info = {
+        "key": {"a": 1, "_fts": "text", "_ftsx": 1},
+        "name": "a_1_b_text_c_text",
+        "unique": True,
+        "expireAfterSeconds": 10,
+        "weights": {"b": 1, "c": 1},
+    }
+    assert index.diff(info) == frozenset()
+    assert index.diff({**info, "unique": False, "hidden": True}) == {
+        "unique",
+        "hidden",
+    }
+    assert index.diff({**info, "key": {"a": -1}}) == {"key"}
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from copy import deepcopy
+from datetime import datetime
+from typing import Any
+
+import pytest
+from pydantic import BaseModel as PydanticBaseModel
+from pydantic import ValidationError, validator
+
+from overlead.odm.fields import ObjectId, Reference
+from overlead.odm.loader import load_fields, load_trusted
+from overlead.odm.motor.model import ObjectIdModel
+from overlead.odm.types import Undefined, undefined
+
+
+class Author(ObjectIdModel):
+    name: str
+
+
+class Sub(PydanticBaseModel):
+    value: float
+
+
+class Post(ObjectIdModel):
+    title: str
+    body: Undefined[str] = undefined
+    views: float = 0
+    created: datetime | None = None
+    author: Reference[Author]
+    editor: Reference[Author] | None = None
+    readers: list[Reference[Author]] = []
+    sub: Sub | None = None
+    subs: list[Sub] = []
+    meta: dict[str, Any] = {}
+    co_author: Author | None = None
+
+
+class Tagged(ObjectIdModel):
+    tags: list[str] = []
+    meta: dict[str, Any] = {}
+    extra: Any = None
+
+
+class Validated(ObjectIdModel):
+    value: str
+
+    @validator("value")
+    def upper(cls, v: str) -> str:  # noqa: N805
+        return v.upper()
+
+
+def test_load_trusted() -> None:
+    data = {
+        "_id": ObjectId(),
+        "title": "title",
+        "views": 1,
+        "created": datetime(2023, 1, 1),  # noqa: DTZ001
+        "author": ObjectId(),
+        "readers": [ObjectId(), ObjectId()],
+        "sub": {"value": 1},
+        "subs": [{"value": 1}, {"value": 2.5}],
+        "meta": {"a": [1, 2]},
+        "co_author": {"_id": ObjectId(), "name": "name"},
+    }
+
+    trusted = load_trusted(Post, data)
+    validated = Post(**data)  # type: ignore[arg-type]
+
+    assert trusted == validated
+    assert trusted.__fields_set__ == validated.__fields_set__
+    assert trusted.body is undefined
+    assert isinstance(trusted.id, ObjectId)
+    assert isinstance(trusted.author, Reference)
+    assert trusted.author.type_ is Author
+    assert all(isinstance(ref, Reference) for ref in trusted.readers)
+    assert isinstance(trusted.views, float)
+    assert isinstance(trusted.sub, Sub)
+    assert isinstance(trusted.co_author, Author)
+    assert isinstance(trusted.co_author.id, ObjectId)
+
+
+def test_load_trusted_defaults() -> None:
+    trusted = load_trusted(Post, {"title": "title", "author": ObjectId()})
+    assert trusted.readers == []
+    assert trusted.readers is not Post.__fields__["readers"].default
+    assert trusted.id is undefined
+
+
+def test_load_trusted_missing_required() -> None:
+    with pytest.raises(ValidationError):
+        load_trusted(Post, {"title": "title"})
+
+
+def test_load_trusted_validators() -> None:
+    assert load_trusted(Validated, {"value": "value"}).value == "VALUE"
+
+
+def test_load_meta() -> None:
+    class TrustedAuthor(Author):
+        class Meta:
+            trusted_load = True
+
+    data = {"_id": ObjectId(), "name": 1}
+    assert not isinstance(TrustedAuthor._load(data).name, str)  # noqa: SLF001
+    assert Author._load(data).name == "1"  # noqa: SLF001
+    assert not isinstance(Author._load(data, trusted=True).name, str)  # noqa: SLF001
+    assert TrustedAuthor._load(data, trusted=False).name == "1"  # noqa: SLF001
+
+
+def test_load_trusted_snapshot() -> None:
+    data = {"_id": ObjectId(), "tags": ["a"], "meta": {"a": [1]}, "extra": {"a": 1}}
+
+    for trusted in (False, True):
+        model = Tagged._load(deepcopy(data), trusted=trusted)  # noqa: SLF001
+        model.tags.append("b")
+        model.meta["b"] = [2]
+        updates, _ = model._get_updates()  # noqa: SLF001
+        assert updates == {
+            "$push": {"tags": {"$each": ["b"]}},
+            "$set": {"meta.b": [2]},
+        }
+
+    model = Tagged._load(deepcopy(data), trusted=True)  # noqa: SLF001
+    model.meta["a"].append(2)
+    model.extra["b"] = 2
+    updates, _ = model._get_updates()  # noqa: SLF001
+    assert updates == {"$set": {"meta": {"a": [1, 2]}, "extra.b": 2}}
+
+
+def test_load_fields() -> None:
+    data = {"_id": ObjectId(), "title": "title", "views": "1", "meta": {"a": 1}}
+
+    for trusted in (False, True):
+        model = load_fields(Post, data, {"id", "views"}, trusted=trusted)
+        assert model.id == data["_id"]
+        assert model.views == 1
+        assert model.title is undefined  # type: ignore[comparison-overlap]
+        assert model.author is undefined  # type: ignore[comparison-overlap]
+        assert model.meta is undefined  # type: ignore[comparison-overlap]
+        assert model.__fields_set__ == {"id", "views"}
+
+    assert load_fields(Post, data, {"readers"}).readers == []
+    assert load_fields(Validated, {"value": "value"}, {"value"}).value == "VALUE"
+
+    with pytest.raises(ValidationError):
+        load_fields(Post, data, {"author"})
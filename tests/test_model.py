@@ -2,6 +2,9 @@ from typing import Any, TypeAlias
 
 import orjson
 import pytest
+from bson import Binary, encode
+from bson.codec_options import TypeDecoder
+from bson.raw_bson import RawBSONDocument
 
 from overlead.odm import triggers
 from overlead.odm.client import get_client
@@ -9,6 +12,7 @@ from overlead.odm.errors import (
     ModelClientError,
     ModelCollectionNameError,
     ModelDatabaseNameError,
+    ModelFieldError,
 )
 from overlead.odm.index import Index
 from overlead.odm.model import BaseModel
@@ -18,6 +22,13 @@ from overlead.odm.utils import PickledBinaryDecoder
 X: TypeAlias = BaseModel[int]
 
 
+class CustomCodec(TypeDecoder):
+    bson_type = Binary  # pyright: ignore
+
+    def transform_bson(self, value: Any) -> Any:  # pragma: no cover
+        return value
+
+
 class ModelTest(X):
     value: str | None
     value_u: Undefined[str] = undefined
@@ -85,6 +96,40 @@ class TestModelType:
             ModelTest.collection == ModelTest.client["database_name"]["collection_name"]
         )
 
+    def test_collection_cached(self) -> None:
+        assert ModelTest.collection is ModelTest.collection
+        assert ModelTest.database is ModelTest.database
+        assert ModelTest._codec_options is ModelTest._codec_options  # noqa: SLF001
+        assert ModelTest._type_registry is ModelTest._type_registry  # noqa: SLF001
+
+    def test_collection_cache_invalidation(self) -> None:
+        class Model(X):
+            class Meta:
+                client = get_client()
+                database_name = "database_name"
+                collection_name = "collection_name"
+
+        collection = Model.collection
+        codec_options = Model._codec_options  # noqa: SLF001
+
+        Model.__meta__.collection_name = "other_collection_name"
+        assert Model.collection is not collection
+        assert Model.collection.name == "other_collection_name"
+        assert Model._codec_options is codec_options  # noqa: SLF001
+
+        Model.__meta__.database_name = "other_database_name"
+        assert Model.collection.database.name == "other_database_name"
+
+        Model.__meta__.client = client = get_client()
+        assert Model.client is client
+        assert Model.database.client is client
+
+        collection = Model.collection
+        codecs = (*Model.__meta__.type_codecs, CustomCodec())
+        Model.__meta__.type_codecs = codecs  # type: ignore[assignment]
+        assert Model._codec_options is not codec_options  # noqa: SLF001
+        assert Model.collection is not collection
+
     def test_load(self) -> None:
         value = 123
         model = ModelTest._load({"_id": 123, "value": "test value"})  # noqa: SLF001
@@ -92,6 +137,21 @@ class TestModelType:
         assert model.value == "test value"
         assert model._olds == {"_id": 123, "value": "test value"}  # noqa: SLF001
 
+    def test_load_raw(self) -> None:
+        data = {"_id": 123, "value": "test value", "extra": 1}
+        codec_options = ModelTest._raw_codec_options  # noqa: SLF001
+        raw = RawBSONDocument(encode(data), codec_options)
+        model = ModelTest._load(raw)  # noqa: SLF001
+        assert model.value == "test value"
+        assert model._olds is raw  # noqa: SLF001
+        assert model._get_olds() == data  # noqa: SLF001
+
+        model.value = "new value"
+        assert model._get_updates() == (  # noqa: SLF001
+            {"$set": {"value": "new value"}, "$unset": {"extra": ""}},
+            {"_id": 123, "value": "new value"},
+        )
+
     def test_get_triggers(self) -> None:
         class Model(BaseModel[Any]):
             @triggers.before_save()
@@ -107,6 +167,11 @@ class TestModelType:
         assert len(list(Model._get_triggers(triggers.after_save))) == 0
         assert len(list(Model._get_triggers(triggers.before_delete))) == 1
 
+        _, table = Model.__handles__["triggers"]
+        assert Model._get_triggers(triggers.before_save) is table[triggers.before_save]
+        Model.__meta__.triggers = ()
+        assert Model._get_triggers(triggers.before_save) == ()
+
 
 class TestModelInstance:
     @pytest.fixture(autouse=True)
@@ -147,6 +212,79 @@ class TestModelInstance:
         model = Model()
         assert model._dump() == {"b": None, "c": "value c"}  # noqa: SLF001
 
+    def test_dirty(self) -> None:
+        model = ModelTest._load({"_id": 1, "value": "value"})  # noqa: SLF001
+        assert model._dirty == set()  # noqa: SLF001
+        model.value_u = "value u"
+        assert model._dirty == {"value_u"}  # noqa: SLF001
+
+    def test_get_updates(self) -> None:
+        data = {"_id": 1, "value": "value", "value_u": "value u", "extra": 1}
+        model = ModelTest._load(data)  # noqa: SLF001
+        assert model._get_updates() == (  # noqa: SLF001
+            {"$unset": {"extra": ""}},
+            {"_id": 1, "value": "value", "value_u": "value u"},
+        )
+
+        model.value = "new value"
+        model.value_u = undefined
+        assert model._get_updates() == (  # noqa: SLF001
+            {"$set": {"value": "new value"}, "$unset": {"value_u": "", "extra": ""}},
+            {"_id": 1, "value": "new value"},
+        )
+        assert model._olds == data  # noqa: SLF001
+
+    def test_get_updates_mutable(self) -> None:
+        class Model(BaseModel[Any]):
+            a: dict[str, int]
+            b: int = 0
+
+        model = Model._load({"_id": 1, "a": {"x": 1}})
+        assert model._changed_fields() == {"a", "b"}  # noqa: SLF001
+        upds, olds = model._get_updates()  # noqa: SLF001
+        assert upds == {"$set": {"b": 0}}
+        model._reset_changes(olds)  # noqa: SLF001
+
+        model.a["x"] = 2
+        assert model._changed_fields() == {"a"}  # noqa: SLF001
+        assert model._get_updates()[0] == {"$set": {"a": {"x": 2}}}  # noqa: SLF001
+
+    def test_get_updates_nested(self) -> None:
+        class Model(BaseModel[Any]):
+            a: dict[str, int | dict[str, int]]
+
+        values = {f"key_{i}": i for i in range(10)}
+        data = {"_id": 1, "a": {**values, "b": {**values, "c": 1}}}
+        model = Model._load(data)
+
+        model.a["b"]["c"] = 2  # type: ignore[index]
+        upds, olds = model._get_updates()  # noqa: SLF001
+        assert upds == {"$set": {"a.b.c": 2}}
+        assert olds == {"_id": 1, "a": {**values, "b": {**values, "c": 2}}}
+        assert olds["a"] is not data["a"]
+
+        model._reset_changes(olds)  # noqa: SLF001
+        assert model._get_updates() == ({}, olds)  # noqa: SLF001
+
+    def test_get_updates_partial(self) -> None:
+        data = {"_id": 1, "value": "value"}
+        fields, projection = ModelTest._projection(["value"])  # noqa: SLF001
+        assert fields == {"id", "value"}
+        assert projection == {"_id": True, "value": True}
+
+        model = ModelTest._load(data, fields=fields)  # noqa: SLF001
+        assert model.value_u is undefined
+        assert model._get_updates() == ({}, data)  # noqa: SLF001
+
+        model.value_u = "value u"
+        upds, olds = model._get_updates()  # noqa: SLF001
+        assert upds == {"$set": {"value_u": "value u"}}
+        model._reset_changes(olds)  # noqa: SLF001
+        assert model._loaded == frozenset(("id", "value", "value_u"))  # noqa: SLF001
+
+        with pytest.raises(ModelFieldError):
+            ModelTest._projection(["unknown"])  # noqa: SLF001
+
     def test_json_undefined(self) -> None:
         class Model(BaseModel[Any]):
             a: Undefined[str] = undefined